@@ -1,35 +1,20 @@
-import pygame
-import pygame.midi
 import math
-import colorsys
-import random
-import pretty_midi
-import time
 from collections import deque
 
-# --- Initialisation Pygame et MIDI ---
-pygame.init()
-pygame.midi.init()
-
-# --- Chargement MIDI ---
-midi_data = pretty_midi.PrettyMIDI(r"C:\Users\hrobi\Desktop\BouncyBalls\music\Spectre_NCS.mid")
-instruments = midi_data.instruments
-all_notes = []
-for chan, inst in enumerate(instruments):
-    for note in inst.notes:
-        all_notes.append((round(note.start,3), note.pitch, note.velocity, chan))
-all_notes.sort(key=lambda x:(x[0],x[1]))
-midi_out = pygame.midi.Output(pygame.midi.get_default_output_id())
-for chan,inst in enumerate(instruments):
-    midi_out.set_instrument(inst.program, chan)
-note_index = 0
+from engine import colors, scene
+from engine.broadphase import UniformGrid
+from engine.physics import Body, Ring, push_off
+from engine.ring import RingRenderer
+from engine.sprites import StaticLayer
+
+# --- Morceau (accords joués un par un à chaque rebond) ---
+SONG = "music/Spectre_NCS.mid"
 
 # --- Config graphique ---
 WIDTH, HEIGHT = 1080, 1920
 FPS = 100
 HUE_SPEED = 0.002
-screen = pygame.display.set_mode((WIDTH, HEIGHT))
-clock = pygame.time.Clock()
+BACKGROUND = (30, 30, 30)
 
 # --- Constantes ---
 GRAVITY = 0.3
@@ -45,203 +30,131 @@ CIRCLE_GAP_CENTER = math.pi / 1.2    # angle central de l’ouverture
 CIRCLE_GAP_WIDTH  = math.pi / 4    # largeur de l’ouverture
 
 
-
-def get_spawn_position():
-    x = random.uniform(SPAWN_X_MIN, SPAWN_X_MAX)
-    y = random.uniform(SPAWN_Y_MIN, SPAWN_Y_MAX)
-    return x, y
-
-
 # --- Classes ---
-class OuterCircle:
+class OuterCircle(Ring):
     def __init__(self, x, y, radius, width=6):
-        self.x, self.y, self.radius, self.width = x, y, radius, width
+        super().__init__(x, y, radius, width, CIRCLE_GAP_CENTER, CIRCLE_GAP_WIDTH)
         self.hue = 0.0
-        # calcul de l’ouverture
-        self.gap_center = CIRCLE_GAP_CENTER
-        self.gap_width  = CIRCLE_GAP_WIDTH
-        self.compute_gap()
+        # teintes du cercle et des balles actives
+        self.colors = colors.hue_table(1.0, 1.0)
+        # anneau pré-rendu : seule la teinte change d'une frame à l'autre
+        self.ring = RingRenderer(radius, width, self.gap_width, background=BACKGROUND)
 
-    def compute_gap(self):
-        self.gap_start = (self.gap_center - self.gap_width/2) % (2*math.pi)
-        self.gap_end   = (self.gap_center + self.gap_width/2) % (2*math.pi)
+    def color(self):
+        return self.colors(self.hue)
 
     def update(self):
         self.hue = (self.hue + HUE_SPEED) % 1.0
 
     def draw(self, surf):
-        r, g, b = colorsys.hsv_to_rgb(self.hue, 1.0, 1.0)
-        color = (int(r*255), int(g*255), int(b*255))
-        rect = pygame.Rect(self.x-self.radius, self.y-self.radius,
-                           2*self.radius, 2*self.radius)
-        # on dessine l’arc en deux segments hors de l’ouverture
-        if self.gap_start < self.gap_end:
-            pygame.draw.arc(surf, color, rect, self.gap_end, 2*math.pi, self.width)
-            pygame.draw.arc(surf, color, rect, 0, self.gap_start, self.width)
-        else:
-            pygame.draw.arc(surf, color, rect, self.gap_end, self.gap_start, self.width)
-
-
-
-class Ball:
-    def __init__(self, x, y, radius, vx, vy):
-        self.x, self.y = x, y
-        self.vx, self.vy = vx, vy
-        self.radius = radius
-        self.spawn_time = time.time()
+        self.ring.draw(surf, self.x, self.y, self.gap_center, self.color())
+
+
+
+class Ball(Body):
+    def __init__(self, x, y, radius, vx, vy, spawn_time):
+        super().__init__(x, y, radius, vx, vy, TIME_SCALE)
+        self.spawn_time = spawn_time
         self.frozen = False
-        self.current_chord = []
         self.trail = deque(maxlen=4)
         self.fill_color = (100, 200, 250)
         self.border_color = (255, 255, 255)
 
-    def update(self, outer, others):
-        global note_index
-        EPS = 1e-3
-        now = time.time()
-        if not self.frozen:
-
-            # Synchroniser la couleur de la balle avec celle du cercle
-            r, g, b = colorsys.hsv_to_rgb(outer.hue, 1.0, 1.0)
-            self.fill_color = (int(r*255), int(g*255), int(b*255))
-
-            # gravité et mouvement
-            self.vy += GRAVITY
-            self.x += self.vx * TIME_SCALE
-            self.y += self.vy * TIME_SCALE
-            self.trail.append((self.x,self.y))
-
-            # collision avec le cercle
-            dx, dy = self.x - outer.x, self.y - outer.y
-            dist = math.hypot(dx, dy)
-            min_dist = outer.radius - self.radius
-            if dist >= min_dist:
-                dy_screen = outer.y - self.y
-                angle = math.atan2(dy_screen, dx) % (2 * math.pi)
-
-                # test si l'angle est DANS l'ouverture
-                if outer.gap_start < outer.gap_end:
-                    in_gap = outer.gap_start <= angle <= outer.gap_end
-                else:
-                    # cas où l'ouverture est à cheval sur 0
-                    in_gap = angle >= outer.gap_start or angle <= outer.gap_end
-
-                if not in_gap:
-                    # rebond : projection normale
-                    nx, ny = dx / dist, dy / dist
-                    # repositionnement
-                    self.x = outer.x + nx * min_dist
-                    self.y = outer.y + ny * min_dist
-                    # réflexion du vecteur vitesse
-                    v_dot_n = self.vx * nx + self.vy * ny
-                    self.vx -= 2 * v_dot_n * nx
-                    self.vy -= 2 * v_dot_n * ny
-
-                    # jouer l'accord MIDI
-                    for p, v, c in self.current_chord:
-                        midi_out.note_off(p, v, c)
-                    if note_index < len(all_notes):
-                        t0 = all_notes[note_index][0]
-                        chord = []
-                        while note_index < len(all_notes) and abs(all_notes[note_index][0] - t0) < EPS:
-                            _, pitch, vel, chan = all_notes[note_index]
-                            chord.append((pitch, vel, chan))
-                            note_index += 1
-                        for p, v, c in chord:
-                            midi_out.note_on(p, v, c)
-                        self.current_chord = chord
-
-                        
-            # collision avec autres balles figées
-            for other in others:
-                if other is not self:
-                    dx, dy = self.x-other.x, self.y-other.y
-                    d = math.hypot(dx,dy)
-                    if d < self.radius+other.radius and d>0:
-                        nx, ny = dx/d, dy/d
-                        overlap = (self.radius+other.radius - d)/2
-                        self.x += nx*overlap
-                        self.y += ny*overlap
-                        # réflection élastique (other étant figé, échange de vitesse partiel)
-                        v_dot_n = self.vx*nx + self.vy*ny
-                        self.vx -= 2*v_dot_n*nx
-                        self.vy -= 2*v_dot_n*ny
-
-                        # --- jouer une note MIDI ---
-                        for p,v,c in self.current_chord:
-                            midi_out.note_off(p,v,c)
-                        if note_index < len(all_notes):
-                            t0 = all_notes[note_index][0]
-                            chord = []
-                            while note_index < len(all_notes) and abs(all_notes[note_index][0]-t0)<EPS:
-                                _, pitch, vel, chan = all_notes[note_index]
-                                chord.append((pitch,vel,chan))
-                                note_index += 1
-                            for p,v,c in chord:
-                                midi_out.note_on(p,v,c)
-                            self.current_chord = chord
-
-            # figer après délai
-            if now - self.spawn_time >= FREEZE_DELAY:
-                self.frozen = True
-
-
-    def draw(self, surf):
+    def update(self, outer, others, now):
+        """Un pas ; renvoie le nombre de rebonds (un accord chacun)."""
+        if self.frozen:
+            return 0
+
+        # Synchroniser la couleur de la balle avec celle du cercle
+        self.fill_color = outer.color()
+
+        # gravité et mouvement, avec contact continu sur le cercle (hors de l'ouverture)
+        x0, y0 = self.x, self.y
+        self.integrate(GRAVITY)
+        hits, _ = outer.sweep(self, x0, y0)
+        bounces = len(hits)
+        self.trail.append((self.x,self.y))
+
+        # collision avec les balles figées (seulement les voisines dans la grille), dans l'ordre de la liste
+        nearby = others.near(self.x, self.y, self.radius)
+        i = 0
+        while i < len(nearby):
+            other = nearby[i]
+            i += 1
+            if other is not self and push_off(self, other):
+                bounces += 1
+                # la poussée a déplacé la balle : voisines à sa nouvelle position, après `other`
+                nearby = others.near(self.x, self.y, self.radius)
+                i = next(k for k, b in enumerate(nearby) if b is other) + 1
+
+        # figer après délai
+        if now - self.spawn_time >= FREEZE_DELAY:
+            self.frozen = True
+        return bounces
+
+
+    def draw(self, surf, sprites):
         # traînée (outline semi-transparent)
         for idx, (tx, ty) in enumerate(self.trail):
             alpha = int(255 * (idx / len(self.trail)))
-            s = pygame.Surface((self.radius*2, self.radius*2), pygame.SRCALPHA)
-            pygame.draw.circle(
-                s,
-                (*self.border_color, alpha),
-                (self.radius, self.radius),
-                self.radius
-            )
-            surf.blit(s, (tx-self.radius, ty-self.radius))
-
-        # balle principale (remplissage + contour)
-        color = self.fill_color
-        center = (int(self.x), int(self.y))
-        # d’abord le contour (largeur 4), puis le remplissage
-        pygame.draw.circle(surf, self.border_color, center, self.radius, width=4)
-        pygame.draw.circle(surf, color, center, self.radius-4)
-
-# --- Initialisation objets ---
-outer = OuterCircle(WIDTH/2, HEIGHT/2, 500)
-balls = []
-n = len(balls)
-vx = BASE_VX + n * DELTA_VX
-vy = BASE_VY + n * DELTA_VY
-sx, sy = get_spawn_position()
-balls.append(Ball(sx, sy, BALL_RADIUS, vx, vy))
-
-# --- Boucle principale ---
-running = True
-while running:
-    for evt in pygame.event.get():
-        if evt.type == pygame.QUIT:
-            running = False
-
-    # si la dernière balle est figée, on en crée une nouvelle
-    if balls[-1].frozen:
-        n = len(balls)
+            sprites.draw_disc(surf, tx, ty, self.radius, self.border_color, alpha)
+
+        # balle principale (contour de largeur 4, puis remplissage à l'intérieur)
+        sprites.draw_ball(surf, self.x, self.y, self.radius,
+                          self.fill_color, self.border_color, 4, inset=True)
+
+
+class FreezeScene(scene.Scene):
+    """Une balle à la fois ; chacune se fige après FREEZE_DELAY et devient un obstacle."""
+    size = (WIDTH, HEIGHT)
+    fps = FPS
+    background = BACKGROUND
+    song = SONG
+
+    def __init__(self, engine):
+        super().__init__(engine)
+        self.outer = OuterCircle(WIDTH/2, HEIGHT/2, 500)
+        self.balls = []                            # balles actives
+        self.frozen_balls = UniformGrid()          # balles figées : collisionneurs statiques
+        self.frozen_layer = StaticLayer(self.size)  # ... et leur rendu, cuit une fois
+        # Un sprite de balle par teinte du cercle, plus les disques de traînée : le cache doit tous les garder
+        self.sprites.maxsize = max(self.sprites.maxsize, 2 * colors.HUE_STEPS)
+        self.spawn()
+
+    def spawn(self):
+        n = len(self.frozen_balls.items)
         vx = BASE_VX + n * DELTA_VX
         vy = BASE_VY + n * DELTA_VY
-        sx, sy = get_spawn_position()
-        balls.append(Ball(sx, sy, BALL_RADIUS, vx, vy))
-
-    # MAJ
-    outer.update()
-    for b in balls:
-        b.update(outer, balls)
-
-    # Rendu
-    screen.fill((30,30,30))
-    outer.draw(screen)
-    for b in balls:
-        b.draw(screen)
-
-    pygame.display.flip()
-    clock.tick(FPS)
-
-pygame.quit()
+        x = self.rng.uniform(SPAWN_X_MIN, SPAWN_X_MAX)
+        y = self.rng.uniform(SPAWN_Y_MIN, SPAWN_Y_MAX)
+        self.balls.append(Ball(x, y, BALL_RADIUS, vx, vy, self.sim.time))
+
+    def step(self):
+        # si la dernière balle est figée, on en crée une nouvelle
+        if not self.balls:
+            self.spawn()
+
+        self.outer.update()
+        now = self.sim.time
+        for b in self.balls:
+            # jouer l'accord MIDI à chaque rebond
+            for _ in range(b.update(self.outer, self.frozen_balls, now)):
+                self.music.play_next()
+        # une balle figée ne change plus : elle quitte la simulation et rejoint le calque statique
+        for b in [b for b in self.balls if b.frozen]:
+            self.balls.remove(b)
+            self.frozen_balls.add(b)
+            b.draw(self.frozen_layer, self.sprites)
+
+    def draw(self, screen):
+        screen.fill(self.background)
+        self.outer.draw(screen)
+        self.frozen_layer.draw(screen)
+        for b in self.balls:
+            b.draw(screen, self.sprites)
+
+
+SCENE = FreezeScene
+
+if __name__ == "__main__":
+    scene.run(FreezeScene)
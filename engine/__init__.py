@@ -0,0 +1,9 @@
+"""
+Outils partagés par les scènes BouncyBalls.
+
+Importer le paquet avant pygame : la bannière d'import de pygame est
+masquée, pour ne pas polluer le flux vidéo écrit sur stdout (BOUNCY_EXPORT=-).
+"""
+import os
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
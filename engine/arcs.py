@@ -0,0 +1,52 @@
+"""
+Index des arcs concentriques des scènes « race », trié par rayon.
+
+Les arcs partagent le même centre : pour une balle à distance `d` du
+centre, seuls les arcs de rayon <= d + rayon_balle peuvent la toucher ou
+être franchis, et ce sont les derniers de la liste triée. On les trouve
+par dichotomie (bisect) au lieu de parcourir et retrier tous les arcs
+pour chaque balle à chaque frame.
+
+Le rétrécissement des arcs (même delta pour tous) ne change pas l'ordre ;
+les ajouts et retraits gardent la liste triée.
+"""
+import math
+from bisect import bisect_left, bisect_right, insort
+from operator import attrgetter
+
+_radius = attrgetter("radius")
+
+
+class ArcIndex:
+    def __init__(self, cx, cy, arcs=()):
+        self.cx, self.cy = cx, cy
+        self._arcs = sorted(arcs, key=_radius)
+
+    def __len__(self):
+        return len(self._arcs)
+
+    def __iter__(self):
+        return iter(self._arcs)
+
+    def __getitem__(self, i):
+        return self._arcs[i]
+
+    def add(self, arc):
+        insort(self._arcs, arc, key=_radius)
+
+    def remove(self, arc):
+        arcs = self._arcs
+        i = bisect_left(arcs, arc.radius, key=_radius)
+        while arcs[i] is not arc:
+            i += 1
+        del arcs[i]
+
+    def distance(self, x, y):
+        """Distance d'un point au centre commun des arcs."""
+        return math.hypot(x - self.cx, y - self.cy)
+
+    def inward_from(self, radius):
+        """Arcs de rayon <= `radius`, du plus grand au plus petit."""
+        arcs = self._arcs
+        for i in range(bisect_right(arcs, radius, key=_radius) - 1, -1, -1):
+            yield arcs[i]
@@ -0,0 +1,267 @@
+"""
+Atlas pré-cuit d'une animation (frames PNG), avec cache sur disque.
+
+Le dossier de frames (frame_000_delay-0.05s.png, ...) est cuit une fois :
+chaque frame est mise à l'échelle, rognée à sa boîte englobante non
+transparente, et son délai est lu dans le nom du fichier. Les pixels de
+toutes les frames sont mis bout à bout dans un seul blob RGBA brut (octets
+dans l'ordre BGRA de l'affichage : le blit ne convertit rien), décrit par
+un petit index JSON (position dans le blob, taille, décalage, délai).
+
+Au chargement, le blob est projeté en mémoire (mmap) : chaque frame est une
+surface pygame posée directement sur ses octets, sans décodage PNG ni copie.
+Le cache (<dossier>/.cache/) est reconstruit quand les fichiers sources
+(noms, tailles, dates) ou l'échelle changent.
+
+Avec un budget mémoire, `load` renvoie un FrameStream : rien n'est lu tant
+que l'animation n'est pas affichée, les frames sont lues du blob à la
+demande et gardées dans une LRU bornée, et un thread précharge celles des
+prochaines `lookahead` secondes d'animation.
+"""
+import hashlib
+import json
+import mmap
+import os
+import queue
+import re
+import tempfile
+import threading
+from collections import OrderedDict
+
+import pygame
+
+# à incrémenter quand le format du blob ou de l'index change
+ATLAS_VERSION = 1
+
+FRAME_PATTERN = re.compile(r"^frame_(\d+)(?:_delay-([\d.]+)s)?\.png$")
+DEFAULT_DELAY = 0.1
+
+
+def source_frames(folder):
+    """Frames du dossier, triées par nom : [(nom, délai en s)]."""
+    frames = []
+    for name in sorted(os.listdir(folder)):
+        match = FRAME_PATTERN.match(name)
+        if match:
+            frames.append((name, float(match.group(2) or DEFAULT_DELAY)))
+    return frames
+
+
+def signature(folder, scale):
+    """Empreinte des frames sources (noms, tailles, dates) et de l'échelle."""
+    digest = hashlib.sha1(f"{ATLAS_VERSION}:{scale!r}".encode())
+    for name, _ in source_frames(folder):
+        st = os.stat(os.path.join(folder, name))
+        digest.update(f"|{name}:{st.st_size}:{st.st_mtime_ns}".encode())
+    return digest.hexdigest()
+
+
+def cache_paths(folder, digest):
+    base = os.path.join(folder, ".cache", f"atlas-{digest[:16]}")
+    return base + ".rgba", base + ".json"
+
+
+def bake(folder, scale, blob_path, index_path):
+    """
+    Cuit les frames de `folder` à l'échelle `scale` dans `blob_path` + `index_path`.
+    Nécessite un mode vidéo (convert_alpha), comme le chargement d'origine.
+    """
+    frames = []
+    offset = 0
+    # fichiers temporaires propres au processus : plusieurs rendus peuvent cuire le même atlas en même temps
+    cache = os.path.dirname(blob_path)
+    with tempfile.NamedTemporaryFile(dir=cache, prefix=os.path.basename(blob_path) + ".", suffix=".tmp",
+                                     delete=False) as blob:
+        for name, delay in source_frames(folder):
+            img = pygame.image.load(os.path.join(folder, name)).convert_alpha()
+            w, h = img.get_size()
+            size = (int(w * scale), int(h * scale))
+            scaled = pygame.transform.smoothscale(img, size)
+            box = scaled.get_bounding_rect()
+            data = pygame.image.tobytes(scaled.subsurface(box), "BGRA") if box.w and box.h else b""
+            blob.write(data)
+            frames.append({"offset": offset, "size": [box.w, box.h], "pos": [box.x, box.y],
+                           "frame": list(size), "delay": delay})
+            offset += len(data)
+    with tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=cache, prefix=os.path.basename(index_path) + ".",
+                                     suffix=".tmp", delete=False) as f:
+        json.dump({"version": ATLAS_VERSION, "scale": scale, "frames": frames}, f)
+    os.replace(blob.name, blob_path)
+    os.replace(f.name, index_path)
+
+
+class Atlas:
+    """Frames d'une animation, posées sur le blob projeté en mémoire."""
+
+    def __init__(self, blob_path, index, delay=None):
+        self.index = index["frames"]
+        self.delays = [delay or frame["delay"] for frame in self.index]
+        with open(blob_path, "rb") as f:
+            # un blob vide ne peut pas être projeté
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if os.fstat(f.fileno()).st_size else b""
+        self._frames = [None] * len(self.index)
+
+    def __len__(self):
+        return len(self.index)
+
+    def frame(self, i):
+        """Surface rognée de la frame i, ou None si elle est entièrement transparente."""
+        surface = self._frames[i]
+        if surface is None and self.index[i]["size"][0]:
+            entry = self.index[i]
+            w, h = entry["size"]
+            view = memoryview(self._map)[entry["offset"]:entry["offset"] + w * h * 4]
+            surface = self._frames[i] = pygame.image.frombuffer(view, (w, h), "BGRA")
+        return surface
+
+    def draw(self, surf, i, center):
+        """Dessine la frame i à l'endroit où l'aurait mise la frame entière centrée sur `center`."""
+        surface = self.frame(i)
+        if surface is None:
+            return
+        entry = self.index[i]
+        fw, fh = entry["frame"]
+        x, y = entry["pos"]
+        surf.blit(surface, (center[0] - fw // 2 + x, center[1] - fh // 2 + y))
+
+    def close(self):
+        self._frames = [None] * len(self.index)
+        if isinstance(self._map, mmap.mmap):
+            self._map.close()
+
+
+class FrameStream(Atlas):
+    """
+    Frames lues à la demande, LRU bornée à `budget` octets de pixels.
+
+    delay     : délai fixe entre deux frames (s), ou None pour ceux de l'index
+    lookahead : durée d'animation (s) préchargée en tâche de fond après chaque frame
+    """
+
+    def __init__(self, blob_path, index, budget, delay=None, lookahead=0.25):
+        self.index = index["frames"]
+        self.delays = [delay or frame["delay"] for frame in self.index]
+        self.budget = budget
+        self.lookahead = lookahead
+        self.used = 0
+        self.reads = 0   # frames lues dans le blob
+        self.misses = 0  # dont lues en attendant, faute de préchargement
+        self._file = open(blob_path, "rb")
+        self._lock = threading.Lock()  # fichier et LRU partagés avec le thread de préchargement
+        self._frames = OrderedDict()
+        self._queue = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, name="frame-prefetch", daemon=True)
+        self._thread.start()
+
+    def _size(self, i):
+        w, h = self.index[i]["size"]
+        return w * h * 4
+
+    def _read(self, i):
+        entry = self.index[i]
+        w, h = entry["size"]
+        with self._lock:
+            surface = self._frames.get(i)
+            if surface is not None:
+                return surface
+            self._file.seek(entry["offset"])
+            data = self._file.read(w * h * 4)
+            self.reads += 1
+        surface = pygame.image.frombytes(data, (w, h), "BGRA")
+        with self._lock:
+            frames = self._frames
+            if i not in frames:
+                frames[i] = surface
+                self.used += self._size(i)
+                # on garde toujours la frame qu'on vient de lire
+                while self.used > self.budget and len(frames) > 1:
+                    old, _ = frames.popitem(last=False)
+                    self.used -= self._size(old)
+        return surface
+
+    def frame(self, i):
+        if not self.index[i]["size"][0]:
+            return None
+        with self._lock:
+            surface = self._frames.get(i)
+            if surface is not None:
+                self._frames.move_to_end(i)
+        if surface is None:
+            self.misses += 1
+            surface = self._read(i)
+        self._queue.put(i)
+        return surface
+
+    def _ahead(self, i):
+        """Frames qui suivent i sur `lookahead` secondes, sans dépasser la moitié du budget."""
+        ahead = []
+        elapsed = size = 0
+        n = len(self.index)
+        j = i
+        while len(ahead) < n - 1:
+            elapsed += self.delays[j]
+            j = (j + 1) % n
+            size += self._size(j)
+            if elapsed > self.lookahead or size > self.budget // 2:
+                break
+            ahead.append(j)
+        return ahead
+
+    def _run(self):
+        while True:
+            i = self._queue.get()
+            if i is None:
+                return
+            # seule la demande la plus récente compte
+            try:
+                while True:
+                    i = self._queue.get_nowait()
+                    if i is None:
+                        return
+            except queue.Empty:
+                pass
+            for j in self._ahead(i):
+                if self.index[j]["size"][0] and j not in self._frames:
+                    self._read(j)
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join(timeout=2.0)
+        self._file.close()
+
+
+def load(folder, scale=1.0, budget=None, delay=None):
+    """
+    Atlas des frames de `folder` à l'échelle `scale`, cuit au premier appel puis relu du cache.
+    `delay` force un délai fixe entre frames ; avec `budget` (octets), un FrameStream.
+    """
+    digest = signature(folder, scale)
+    blob_path, index_path = cache_paths(folder, digest)
+    try:
+        with open(index_path, encoding="utf-8") as f:
+            index = json.load(f)
+        if index["version"] == ATLAS_VERSION and os.path.exists(blob_path):
+            return _open(blob_path, index, budget, delay)
+    except (OSError, KeyError, ValueError):
+        pass
+
+    cache = os.path.dirname(blob_path)
+    os.makedirs(cache, exist_ok=True)
+    # on remplace les anciens atlas de ce dossier (pas celui qu'un rendu simultané vient de cuire,
+    # ni ce qu'il a déjà retiré)
+    current = (os.path.basename(blob_path), os.path.basename(index_path))
+    for name in os.listdir(cache):
+        if name.startswith("atlas-") and name.endswith((".rgba", ".json")) and name not in current:
+            try:
+                os.remove(os.path.join(cache, name))
+            except FileNotFoundError:
+                pass
+    bake(folder, scale, blob_path, index_path)
+    with open(index_path, encoding="utf-8") as f:
+        return _open(blob_path, json.load(f), budget, delay)
+
+
+def _open(blob_path, index, budget, delay):
+    if budget is None:
+        return Atlas(blob_path, index, delay)
+    return FrameStream(blob_path, index, budget, delay)
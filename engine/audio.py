@@ -0,0 +1,209 @@
+"""
+Bande-son des clips exportés, synthétisée hors-ligne.
+
+Pendant une partie, `Soundtrack` relaie les accords vers la sortie MIDI ;
+en export, il note chaque accord et chaque effet joué par le mixeur
+d'effets (yes / no / rebonds) avec son temps de simulation. À la fermeture, la
+bande-son est synthétisée en une passe, sans carte son ni banque de sons :
+
+ - un synthé à table d'onde par famille General MIDI (programme // 8),
+   avec enveloppe attaque / déclin / relâchement, et des percussions
+   synthétiques pour les pistes de batterie ;
+ - rendu NumPy par blocs d'échantillons, les effets (échantillons PCM
+   décodés par pygame) mixés dans le même tampon ;
+ - écriture d'un WAV 16 bits stéréo, calé à l'échantillon près sur les
+   frames du clip.
+"""
+import math
+import wave
+
+import numpy as np
+import pygame
+
+RATE = 44100
+BLOCK = 8192
+TABLE_SIZE = 2048
+NOTE_GAIN = 0.12
+
+# familles GM : amplitudes des harmoniques 1, 2, 3... puis (attaque, déclin, sustain, relâchement)
+FAMILIES = [
+    ((1, .5, .3, .2, .1), (.005, .6, .25, .3)),       # pianos
+    ((1, 0, .4, 0, .2), (.002, .4, 0., .4)),          # percussions chromatiques
+    ((1, .8, .6, .4, .3, .2), (.02, .1, .9, .08)),    # orgues
+    ((1, .6, .4, .3, .2, .1), (.003, .5, .15, .2)),   # guitares
+    ((1, .4, .1), (.005, .4, .5, .1)),                # basses
+    ((1, .7, .5, .4, .3, .2, .1), (.08, .3, .8, .3)),  # cordes
+    ((1, .6, .4, .3, .2), (.1, .3, .8, .4)),          # ensembles
+    ((1, .9, .7, .5, .4, .3), (.03, .2, .8, .15)),    # cuivres
+    ((1, .1, .6, .1, .3), (.03, .2, .8, .1)),         # anches
+    ((1, .2, .05), (.05, .2, .9, .15)),               # flûtes
+    ((1, .5, .33, .25, .2, .17, .14), (.01, .2, .8, .1)),  # synthé lead
+    ((1, .5, .3, .2), (.3, .5, .7, .8)),              # synthé pad
+    ((1, .3, .6, .2), (.05, .5, .5, .5)),             # synthé FX
+    ((1, .4, .5, .1), (.005, .5, .2, .2)),            # ethniques
+    ((1, .2, .3), (.001, .2, 0., .1)),                # percussifs
+    ((1, .3, .2, .1), (.01, .3, .3, .2)),             # effets sonores
+]
+
+
+def _wavetables():
+    phase = np.arange(TABLE_SIZE) * (2 * math.pi / TABLE_SIZE)
+    tables = []
+    for harmonics, _ in FAMILIES:
+        table = sum(a * np.sin((k + 1) * phase) for k, a in enumerate(harmonics))
+        tables.append((table / np.abs(table).max()).astype(np.float32))
+    return tables
+
+
+class Soundtrack:
+    """
+    Relais des événements sonores d'une scène, enregistrés en export.
+
+    midi   : sortie MIDI en direct (MidiWorker / NullMidiOutput), ou None
+    chords : ChordTimeline du morceau (programmes et pistes de batterie)
+    path   : WAV à écrire à la fermeture, ou None pour ne rien enregistrer
+    """
+
+    def __init__(self, sim, midi=None, chords=None, path=None):
+        self.sim = sim
+        self.midi = midi
+        self.path = path
+        self.programs = chords.programs.tolist() if chords is not None else []
+        self.drums = chords.drums.tolist() if chords is not None else []
+        self.notes = []    # (temps, pitch, velocity, canal, durée)
+        self.effects = []  # (temps, sound, volume)
+
+    def play_chord(self, notes, durations):
+        if self.midi is not None:
+            self.midi.play_chord(notes, durations)
+        if self.path:
+            t = self.sim.time
+            self.notes.extend((t, p, v, c, d) for (p, v, c), d in zip(notes, durations))
+
+    def effect(self, sound, volume):
+        """Note un effet joué maintenant (voix déjà lancée par le mixeur d'effets)."""
+        if self.path:
+            self.effects.append((self.sim.time, sound, volume))
+
+    def close(self):
+        if self.midi is not None:
+            self.midi.close()
+        if self.path:
+            rate = output_rate()
+            write_wav(self.path, self.render(self.sim.time, rate), rate)
+
+    def render(self, seconds, rate):
+        """Bande-son de `seconds` secondes : tableau float32 (n, 2) dans [-1, 1]."""
+        length = int(round(seconds * rate))
+        out = np.zeros((length, 2), dtype=np.float32)
+        mono = np.zeros(length, dtype=np.float32)
+        _render_notes(mono, self.notes, self.programs, self.drums, rate)
+        out += mono[:, None]
+        _mix_effects(out, self.effects, rate)
+        peak = float(np.abs(out).max()) if length else 0.0
+        if peak > 1.0:
+            out /= peak
+        return out
+
+
+def output_rate():
+    """Fréquence du mixer pygame (celle des effets décodés), sinon RATE."""
+    mixer = pygame.mixer.get_init()
+    return mixer[0] if mixer else RATE
+
+
+def _render_notes(out, notes, programs, drums, rate):
+    if not notes:
+        return
+    tables = _wavetables()
+    noise = np.random.default_rng(0).uniform(-1, 1, rate).astype(np.float32)
+
+    # une ligne par note : début, fin (relâchement compris) en échantillons
+    n = len(notes)
+    start = np.empty(n, dtype=np.int64)
+    stop = np.empty(n, dtype=np.int64)
+    params = []
+    for i, (t, pitch, velocity, chan, duration) in enumerate(notes):
+        drum = chan < len(drums) and drums[chan]
+        family = programs[chan] // 8 if chan < len(programs) else 0
+        release = 0.15 if drum else FAMILIES[family][1][3]
+        start[i] = int(round(t * rate))
+        stop[i] = start[i] + int((duration + 4 * release) * rate) + 1
+        params.append((pitch, velocity / 127 * NOTE_GAIN, duration, drum, family))
+    order = np.argsort(start, kind="stable")
+    start, stop = start[order], stop[order]
+    params = [params[i] for i in order]
+
+    length = len(out)
+    for b0 in range(0, length, BLOCK):
+        b1 = min(b0 + BLOCK, length)
+        # notes commencées avant la fin du bloc et pas encore éteintes
+        last = int(np.searchsorted(start, b1))
+        for i in np.nonzero(stop[:last] > b0)[0].tolist():
+            s0 = max(b0, start[i])
+            s1 = min(b1, stop[i])
+            t = (np.arange(s0, s1) - start[i]) / rate
+            pitch, gain, duration, drum, family = params[i]
+            if drum:
+                out[s0:s1] += gain * _drum(t, pitch, noise)
+            else:
+                out[s0:s1] += gain * _tone(t, pitch, duration, tables[family], FAMILIES[family][1])
+
+
+def _tone(t, pitch, duration, table, envelope):
+    attack, decay, sustain, release = envelope
+    freq = 440.0 * 2 ** ((pitch - 69) / 12)
+    index = (t * (freq * TABLE_SIZE)).astype(np.int64) % TABLE_SIZE
+    env = np.minimum(t / attack, 1.0) * (sustain + (1 - sustain) * np.exp(-t / decay))
+    # relâchement après la fin de la note ; exposant borné à 0 avant (pas de débordement sur les notes longues)
+    env *= np.exp(-np.maximum(t - duration, 0.0) / release)
+    return table[index] * env
+
+
+def _drum(t, pitch, noise):
+    """Percussions GM : grosse caisse (35-36) sinusoïdale, le reste en bruit amorti."""
+    if pitch <= 36:
+        phase = 2 * math.pi * (50 * t + 60 * 0.05 * (1 - np.exp(-t / 0.05)))
+        return np.sin(phase) * np.exp(-t / 0.15) * 1.5
+    hit = noise[(np.rint(t * len(noise)).astype(np.int64) + pitch * 97) % len(noise)]
+    if pitch in (42, 44, 46, 49, 51, 52, 55, 57, 59):
+        # cymbales et charleston : bruit plus aigu, déclin selon le type
+        hit = np.diff(hit, prepend=hit[:1]) * 0.7
+        return hit * np.exp(-t / (0.3 if pitch in (46, 49, 55, 57) else 0.05))
+    return hit * np.exp(-t / 0.12)
+
+
+def _mix_effects(out, effects, rate):
+    decoded = {}
+    for t, sound, volume in effects:
+        samples = decoded.get(sound)
+        if samples is None:
+            samples = decoded[sound] = _decode(sound)
+        s0 = int(round(t * rate))
+        if s0 >= len(out):
+            continue
+        s1 = min(len(out), s0 + len(samples))
+        out[s0:s1] += samples[:s1 - s0] * volume
+
+
+def _decode(sound):
+    """Échantillons d'un pygame.mixer.Sound, en float32 stéréo dans [-1, 1]."""
+    raw = pygame.sndarray.array(sound)
+    samples = raw.astype(np.float32)
+    if raw.dtype.kind != "f":
+        half = float(2 ** (raw.dtype.itemsize * 8 - 1))
+        if raw.dtype.kind == "u":
+            samples -= half
+        samples /= half
+    if samples.ndim == 1:
+        samples = np.repeat(samples[:, None], 2, axis=1)
+    return samples[:, :2]
+
+
+def write_wav(path, samples, rate):
+    pcm = (np.clip(samples, -1.0, 1.0) * 32767).astype("<i2")
+    with wave.open(path, "wb") as f:
+        f.setnchannels(2)
+        f.setsampwidth(2)
+        f.setframerate(rate)
+        f.writeframes(pcm.tobytes())
@@ -0,0 +1,63 @@
+"""
+Broadphase des collisions balle-balle : grille uniforme (hachage spatial).
+
+Les cellules sont carrées, de côté égal au diamètre de la plus grosse
+balle rangée : deux balles de la grille qui se touchent sont forcément dans
+la même cellule ou dans deux cellules voisines. `near` ne renvoie donc à
+la réponse élastique que les voisines d'une balle, au lieu de toutes.
+
+Pour des balles immobiles (collisionneurs statiques), `add` range les
+balles une à une sans tout reconstruire. Les balles mobiles en nombre
+passent par swarm.Swarm, qui a sa propre grille vectorisée.
+"""
+import math
+from collections import defaultdict
+
+
+class UniformGrid:
+    def __init__(self):
+        self.cell = 1.0
+        self.items = []
+        self._cells = defaultdict(list)
+
+    def _key(self, x, y):
+        return int(x // self.cell), int(y // self.cell)
+
+    def rebuild(self, balls):
+        """Range les balles (attributs x, y, radius) dans des cellules de côté 2 * rayon max."""
+        self.items = list(balls)
+        self.cell = max(2 * max((b.radius for b in balls), default=0), 1.0)
+        cells = self._cells
+        cells.clear()
+        for i, b in enumerate(balls):
+            cells[self._key(b.x, b.y)].append(i)
+
+    def add(self, ball):
+        """Ajout incrémental (collisionneurs statiques) ; la grille s'agrandit si la balle l'exige."""
+        if 2 * ball.radius > self.cell:
+            self.rebuild(self.items + [ball])
+            return
+        self.items.append(ball)
+        self._cells[self._key(ball.x, ball.y)].append(len(self.items) - 1)
+
+    def near(self, x, y, radius=0.0):
+        """
+        Balles qui peuvent toucher une balle de rayon `radius` centrée en
+        (x, y), dans l'ordre de la liste d'origine : les 9 cellules autour,
+        davantage si la balle cherchée est plus grosse que celles de la grille.
+        """
+        if not self.items:
+            return []
+        cells = self._cells
+        cx, cy = self._key(x, y)
+        # portée du contact : son rayon + le plus grand rayon rangé (au plus une demi-cellule)
+        span = max(1, math.ceil((radius + self.cell / 2) / self.cell))
+        found = []
+        for dx in range(-span, span + 1):
+            for dy in range(-span, span + 1):
+                members = cells.get((cx + dx, cy + dy))
+                if members:
+                    found.extend(members)
+        found.sort()
+        items = self.items
+        return [items[i] for i in found]
@@ -0,0 +1,85 @@
+"""
+Couleurs partagées par les scènes : tables de teintes et mélanges de palette.
+
+Les scènes animent tout en teinte (HSV) à saturation et valeur fixes. Au
+lieu d'appeler colorsys.hsv_to_rgb puis int(c * 255) pour chaque objet à
+chaque frame, chaque couple (saturation, valeur) a sa table de HUE_STEPS
+couleurs, calculée une fois : une couleur n'est plus qu'une lecture
+indexée. Avec 6 x 256 pas, deux entrées voisines ne diffèrent que d'un
+niveau sur un canal ; les teintes multiples de 1/256 (sprites de
+particules) tombent exactement sur une entrée.
+
+PaletteBlend calcule en bloc (NumPy) les couleurs d'un ensemble d'arcs qui
+oscillent chacun entre deux couleurs de palette.
+"""
+import colorsys
+import math
+
+import numpy as np
+
+HUE_STEPS = 6 * 256
+
+_tables = {}
+
+
+class HueTable:
+    def __init__(self, sat, val):
+        self.sat, self.val = sat, val
+        self.colors = []
+        for i in range(HUE_STEPS):
+            r, g, b = colorsys.hsv_to_rgb(i / HUE_STEPS, sat, val)
+            self.colors.append((int(r * 255), int(g * 255), int(b * 255)))
+
+    def __call__(self, hue):
+        """Couleur (r, g, b) de la teinte `hue` (dans [0, 1), modulo 1)."""
+        return self.colors[int(hue * HUE_STEPS + 0.5) % HUE_STEPS]
+
+    def indices(self, hues):
+        """Indices dans `colors` d'un tableau de teintes, arrondis comme __call__."""
+        return np.floor(np.asarray(hues) * HUE_STEPS + 0.5).astype(np.int64) % HUE_STEPS
+
+
+def hue_table(sat, val):
+    """Table partagée du couple (saturation, valeur)."""
+    table = _tables.get((sat, val))
+    if table is None:
+        table = _tables[(sat, val)] = HueTable(sat, val)
+    return table
+
+
+def blend(c1, c2, f):
+    """Mélange linéaire de couleurs (n, 3) par les facteurs f (n,), tronqué à l'entier."""
+    f = np.asarray(f)[:, None]
+    return (np.asarray(c1) * (1 - f) + np.asarray(c2) * f).astype(np.int64)
+
+
+class PaletteBlend:
+    """
+    Couleurs oscillant chacune entre deux couleurs de palette :
+    f = (sin(2π t / période + phase) + 1) / 2, couleur = c1 (1 - f) + c2 f.
+    """
+
+    def __init__(self):
+        self._c1, self._c2, self._omega, self._phase = [], [], [], []
+        self._arrays = None
+        self.factors = []
+        self.colors = []
+
+    def add(self, c1, c2, period, phase):
+        """Ajoute une entrée ; renvoie son indice."""
+        self._c1.append(c1)
+        self._c2.append(c2)
+        self._omega.append(2 * math.pi / period)
+        self._phase.append(phase)
+        self._arrays = None
+        return len(self._c1) - 1
+
+    def update(self, t):
+        """Facteurs et couleurs de toutes les entrées à l'instant t."""
+        if self._arrays is None:
+            self._arrays = (np.array(self._c1, dtype=np.float64), np.array(self._c2, dtype=np.float64),
+                            np.array(self._omega), np.array(self._phase))
+        c1, c2, omega, phase = self._arrays
+        f = (np.sin(omega * t + phase) + 1) / 2
+        self.factors = f.tolist()
+        self.colors = [tuple(c) for c in blend(c1, c2, f).tolist()]
@@ -0,0 +1,142 @@
+"""
+Export hors-ligne : rendu sans fenêtre, aussi vite que le CPU le permet.
+
+Activé par la variable d'environnement BOUNCY_EXPORT :
+ - un dossier         -> une image numérotée par frame (frame_000000.png, ...)
+ - un fichier .rgb    -> flux vidéo brut RGB24
+ - "-"                -> flux vidéo brut RGB24 sur stdout
+
+Exemple avec ffmpeg :
+    BOUNCY_EXPORT=- python circle_freeze.py | \
+        ffmpeg -f rawvideo -pix_fmt rgb24 -s 1080x1920 -r 100 -i - clip.mp4
+
+BOUNCY_EXPORT_SECONDS fixe la durée du clip (30 s par défaut) et
+BOUNCY_EXPORT_IMAGE le format des images (png, bmp, tga...).
+
+La bande-son (musique + effets) est synthétisée dans un WAV à côté des
+frames (dossier/soundtrack.wav, ou clip.wav pour clip.rgb) ; en flux sur
+stdout, BOUNCY_EXPORT_AUDIO donne son chemin (il remplace aussi le chemin
+par défaut).
+"""
+import os
+import sys
+
+import pygame
+
+from .audio import Soundtrack
+from .midiout import MidiWorker
+
+EXPORT_PATH = os.environ.get("BOUNCY_EXPORT")
+EXPORT_SECONDS = float(os.environ.get("BOUNCY_EXPORT_SECONDS", 30))
+EXPORT_IMAGE = os.environ.get("BOUNCY_EXPORT_IMAGE", "png")
+EXPORT_AUDIO = os.environ.get("BOUNCY_EXPORT_AUDIO")
+RAW_EXTENSIONS = (".rgb", ".raw")
+
+
+def enabled():
+    return bool(EXPORT_PATH)
+
+
+def init_headless():
+    """À appeler avant pygame.init() : bascule SDL sur les pilotes factices."""
+    if enabled():
+        os.environ["SDL_VIDEODRIVER"] = "dummy"
+        os.environ["SDL_AUDIODRIVER"] = "dummy"
+
+
+class NullMidiOutput:
+    """Sortie MIDI muette, pour les machines de rendu sans périphérique MIDI."""
+
+    def set_instrument(self, program, channel=0):
+        pass
+
+    def note_on(self, note, velocity, channel=0):
+        pass
+
+    def note_off(self, note, velocity=0, channel=0):
+        pass
+
+    def play_chord(self, notes, durations):
+        pass
+
+    def close(self):
+        pass
+
+
+def open_midi_output():
+    """Sortie MIDI par défaut (dans son thread), ou une sortie muette en export / sans périphérique."""
+    import pygame.midi
+    if not enabled():
+        device = pygame.midi.get_default_output_id()
+        if device != -1:
+            return MidiWorker(pygame.midi.Output(device))
+    return NullMidiOutput()
+
+
+def audio_path():
+    """WAV de la bande-son du clip exporté, ou None."""
+    if not enabled():
+        return None
+    if EXPORT_AUDIO:
+        return EXPORT_AUDIO
+    if EXPORT_PATH == "-":
+        return None
+    if EXPORT_PATH.lower().endswith(RAW_EXTENSIONS):
+        return os.path.splitext(EXPORT_PATH)[0] + ".wav"
+    return os.path.join(EXPORT_PATH, "soundtrack.wav")
+
+
+def open_soundtrack(sim, midi=None, chords=None):
+    """Relais des sons de la scène ; en export, enregistre la bande-son du clip."""
+    return Soundtrack(sim, midi, chords, audio_path())
+
+
+class FrameExporter:
+    """Écrit chaque frame de `screen` dans une séquence d'images ou un flux brut."""
+
+    def __init__(self, path, fps, seconds=EXPORT_SECONDS):
+        self.path = path
+        self.max_frames = int(round(seconds * fps))
+        self.frame = 0
+        self.stream = None
+        if path == "-":
+            self.stream = _claim_stdout()
+        elif path.lower().endswith(RAW_EXTENSIONS):
+            self.stream = open(path, "wb")
+        else:
+            os.makedirs(path, exist_ok=True)
+
+    def write(self, surf):
+        """Ajoute une frame. Retourne False quand le clip est complet."""
+        if self.stream is not None:
+            self.stream.write(pygame.image.tobytes(surf, "RGB"))
+        else:
+            name = f"frame_{self.frame:06d}.{EXPORT_IMAGE}"
+            pygame.image.save(surf, os.path.join(self.path, name))
+        self.frame += 1
+        return self.frame < self.max_frames
+
+    def close(self):
+        if self.stream is not None:
+            self.stream.close()
+            self.stream = None
+
+
+def _claim_stdout():
+    """
+    Réserve stdout au flux vidéo : les frames partent sur une copie du
+    descripteur, et tout autre affichage (print, messages de SDL) est
+    renvoyé sur stderr, pour ne pas décaler les frames lues par ffmpeg.
+    """
+    sys.stdout.flush()
+    fd = os.dup(sys.stdout.fileno())
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+    sys.stdout = sys.stderr
+    return os.fdopen(fd, "wb")
+
+
+def open_exporter(fps):
+    """FrameExporter configuré par l'environnement, ou None en mode fenêtre."""
+    if not enabled():
+        return None
+    return FrameExporter(EXPORT_PATH, fps)
@@ -0,0 +1,50 @@
+"""
+Interface (scores, chrono) rendue une fois, puis seulement quand elle change.
+
+Un Panel est un rectangle translucide arrondi, dessiné une seule fois dans
+sa propre surface, avec un texte centré. Le texte n'est re-rendu par la
+police que si sa valeur change (score qui bouge, dixième de seconde
+suivant) ; sinon chaque frame ne fait que deux blits.
+
+Le résultat est identique au dessin direct : même fond composé sur
+l'écran, puis même texte par-dessus.
+"""
+import pygame
+
+
+class Text:
+    """Texte d'une police et d'une couleur, re-rendu seulement quand sa valeur change."""
+
+    def __init__(self, font, color, antialias=True):
+        self.font = font
+        self.color = color
+        self.antialias = antialias
+        self.renders = 0
+        self._value = None
+        self._surface = None
+
+    def get(self, value):
+        if value != self._value:
+            self._value = value
+            self._surface = self.font.render(value, self.antialias, self.color)
+            self.renders += 1
+        return self._surface
+
+
+class Panel:
+    def __init__(self, rect, color, alpha, font, text_color, border_radius=0):
+        self.rect = pygame.Rect(rect)
+        self.background = pygame.Surface(self.rect.size, pygame.SRCALPHA)
+        pygame.draw.rect(self.background, (*color, alpha), self.background.get_rect(),
+                         border_radius=border_radius)
+        self.text = Text(font, text_color)
+        self._pos = None
+        self._last = None
+
+    def draw(self, surf, value):
+        label = self.text.get(value)
+        if label is not self._last:
+            self._last = label
+            self._pos = label.get_rect(center=self.rect.center)
+        surf.blit(self.background, self.rect.topleft)
+        surf.blit(label, self._pos)
@@ -0,0 +1,172 @@
+"""
+Index de la bibliothèque musicale : statistiques de chaque fichier MIDI.
+
+Pour chaque .mid du dossier, l'index retient :
+ - le nombre d'accords (un accord = un rebond dans les scènes) et la durée ;
+ - la densité d'accords, par fenêtres de DENSITY_WINDOW secondes ;
+ - les instruments : canal, programme General MIDI, batterie, nombre de notes ;
+ - la polyphonie maximale (notes tenues en même temps) et le plus gros accord.
+
+Les fichiers sont analysés en parallèle (un processus par cœur), et
+l'index est écrit dans music/.cache/library.json. Il est incrémental : seuls
+les fichiers ajoutés ou modifiés (taille, date) sont réanalysés, les
+fichiers disparus sont retirés.
+
+En ligne de commande, depuis la racine du projet :
+    python -m engine.library                      # tout le dossier music/
+    python -m engine.library --chords 150 250     # morceaux de 150 à 250 accords
+"""
+import argparse
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from . import timeline
+
+# à incrémenter quand le contenu des entrées change
+INDEX_VERSION = 1
+
+# largeur (s) des fenêtres de densité d'accords
+DENSITY_WINDOW = 5.0
+
+MUSIC_FOLDER = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "music")
+
+
+def index_path(folder):
+    return os.path.join(folder, ".cache", "library.json")
+
+
+def _signature(path):
+    st = os.stat(path)
+    return [st.st_size, st.st_mtime_ns]
+
+
+def analyze(path):
+    """Statistiques d'un fichier MIDI (dict sérialisable en JSON)."""
+    arrays = timeline.compile_midi(path)
+    offsets = arrays["offsets"]
+    starts = arrays["starts"]
+    channel = arrays["channel"]
+    chords = len(starts)
+
+    # début de chaque note = début de son accord
+    note_starts = np.repeat(starts, np.diff(offsets))
+    note_ends = note_starts + arrays["duration"]
+    duration = float(note_ends.max()) if chords else 0.0
+
+    # polyphonie : balayage des débuts (+1) et fins (-1), fins d'abord à temps égal
+    times = np.concatenate([note_ends, note_starts])
+    steps = np.concatenate([-np.ones(len(note_ends), np.int64), np.ones(len(note_starts), np.int64)])
+    order = np.lexsort((steps, times))
+    polyphony = int(np.cumsum(steps[order]).max()) if chords else 0
+
+    bins = max(1, int(np.ceil(duration / DENSITY_WINDOW)))
+    density, _ = np.histogram(starts, bins=bins, range=(0.0, bins * DENSITY_WINDOW))
+
+    counts = np.bincount(channel, minlength=len(arrays["programs"]))
+    return {
+        "chords": chords,
+        "notes": int(len(channel)),
+        "duration": round(duration, 3),
+        "density": density.tolist(),
+        "channels": [
+            {"channel": chan, "program": int(program), "drum": bool(drum), "notes": int(count)}
+            for chan, (program, drum, count) in enumerate(zip(arrays["programs"], arrays["drums"], counts))
+        ],
+        "max_polyphony": polyphony,
+        "max_chord": int(np.diff(offsets).max()) if chords else 0,
+    }
+
+
+def _analyze_entry(path):
+    try:
+        return analyze(path)
+    except (OSError, ValueError, IndexError) as e:
+        return {"error": f"{type(e).__name__}: {e}"}
+
+
+def _load_index(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if index.get("version") != INDEX_VERSION:
+        return {}
+    return index.get("files", {})
+
+
+def build(folder=MUSIC_FOLDER, workers=None):
+    """
+    Met à jour l'index de `folder` et le renvoie : {nom de fichier: entrée}.
+    Seuls les fichiers nouveaux ou modifiés sont analysés, dans un pool de processus.
+    """
+    path = index_path(folder)
+    old = _load_index(path)
+    names = sorted(n for n in os.listdir(folder) if n.lower().endswith((".mid", ".midi")))
+
+    files = {}
+    stale = []
+    for name in names:
+        signature = _signature(os.path.join(folder, name))
+        entry = old.get(name)
+        if entry is not None and entry["signature"] == signature:
+            files[name] = entry
+        else:
+            files[name] = {"signature": signature}
+            stale.append(name)
+
+    paths = [os.path.join(folder, name) for name in stale]
+    if len(paths) > 1 and workers != 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_analyze_entry, paths, chunksize=max(1, len(paths) // 32)))
+    else:
+        results = [_analyze_entry(p) for p in paths]
+    for name, stats in zip(stale, results):
+        files[name].update(stats)
+
+    if stale or len(files) != len(old):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"version": INDEX_VERSION, "files": files}, f, indent=1)
+        os.replace(tmp, path)
+    return files
+
+
+def find(files, min_chords=0, max_chords=None):
+    """Noms des morceaux dont le nombre d'accords est dans [min_chords, max_chords], triés."""
+    return sorted(
+        (name for name, entry in files.items()
+         if "chords" in entry
+         and entry["chords"] >= min_chords
+         and (max_chords is None or entry["chords"] <= max_chords)),
+        key=lambda name: files[name]["chords"],
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Index des morceaux MIDI (accords, densité, polyphonie).")
+    parser.add_argument("folder", nargs="?", default=MUSIC_FOLDER)
+    parser.add_argument("--chords", nargs=2, type=int, metavar=("MIN", "MAX"),
+                        help="ne garder que les morceaux dont le nombre d'accords est dans [MIN, MAX]")
+    parser.add_argument("--workers", type=int, default=None, help="nombre de processus (par défaut : un par cœur)")
+    args = parser.parse_args()
+
+    files = build(args.folder, args.workers)
+    names = find(files, *args.chords) if args.chords else sorted(files)
+    print(f"{'morceau':32s} {'accords':>7s} {'durée':>7s} {'acc/s':>6s} {'poly':>4s} {'canaux':>6s}")
+    for name in names:
+        entry = files[name]
+        if "error" in entry:
+            print(f"{name:32s} erreur : {entry['error']}")
+            continue
+        rate = entry["chords"] / entry["duration"] if entry["duration"] else 0.0
+        print(f"{name:32s} {entry['chords']:7d} {entry['duration']:6.1f}s {rate:6.2f} "
+              f"{entry['max_polyphony']:4d} {len(entry['channels']):6d}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Sortie MIDI dans un thread dédié, avec note-off programmés.
+
+La boucle physique ne fait que déposer des événements horodatés dans une
+file (queue.SimpleQueue, sans verrou côté producteur) : la latence du
+pilote MIDI ne se voit jamais dans la durée d'une frame. Le thread envoie
+les note-on, puis relâche chaque note après sa durée d'origine dans le
+fichier MIDI, grâce à un tas d'échéances (heapq).
+
+Une note rejouée avant la fin de la précédente (même canal, même hauteur)
+annule l'échéance de celle-ci : c'est la nouvelle durée qui compte.
+"""
+import heapq
+import queue
+import threading
+import time
+
+
+class MidiWorker:
+    """Même interface que pygame.midi.Output, plus `play_chord` et des durées de notes."""
+
+    def __init__(self, output):
+        self.output = output
+        self._queue = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, name="midi-out", daemon=True)
+        self._thread.start()
+
+    def set_instrument(self, program, channel=0):
+        self._queue.put(("program", program, channel))
+
+    def note_on(self, note, velocity, channel=0, duration=None):
+        self._queue.put(("chord", time.monotonic(), [(note, velocity, channel)], [duration]))
+
+    def note_off(self, note, velocity=0, channel=0):
+        self._queue.put(("off", note, velocity, channel))
+
+    def play_chord(self, notes, durations):
+        """Joue les notes (pitch, velocity, canal) et relâche chacune après sa durée (s)."""
+        self._queue.put(("chord", time.monotonic(), notes, durations))
+
+    def close(self):
+        """Relâche les notes encore tenues, puis ferme la sortie."""
+        self._queue.put(("close",))
+        self._thread.join(timeout=2.0)
+
+    def _run(self):
+        output = self.output
+        deadlines = []  # (échéance, génération, pitch, canal)
+        generation = {}  # (canal, pitch) -> génération de la note qui sonne
+        serial = 0
+        while True:
+            timeout = max(0.0, deadlines[0][0] - time.monotonic()) if deadlines else None
+            try:
+                event = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                event = None
+
+            now = time.monotonic()
+            while deadlines and deadlines[0][0] <= now:
+                _, gen, pitch, chan = heapq.heappop(deadlines)
+                if generation.get((chan, pitch)) == gen:
+                    del generation[(chan, pitch)]
+                    output.note_off(pitch, 0, chan)
+            if event is None:
+                continue
+
+            kind = event[0]
+            if kind == "chord":
+                _, stamp, notes, durations = event
+                for (pitch, velocity, chan), duration in zip(notes, durations):
+                    serial += 1
+                    generation[(chan, pitch)] = gen = serial
+                    output.note_on(pitch, velocity, chan)
+                    if duration is not None:
+                        # échéance comptée depuis le dépôt de l'événement, pas depuis son envoi
+                        heapq.heappush(deadlines, (stamp + duration, gen, pitch, chan))
+            elif kind == "off":
+                _, pitch, velocity, chan = event
+                generation.pop((chan, pitch), None)
+                output.note_off(pitch, velocity, chan)
+            elif kind == "program":
+                _, program, chan = event
+                output.set_instrument(program, chan)
+            elif kind == "close":
+                for chan, pitch in generation:
+                    output.note_off(pitch, 0, chan)
+                output.close()
+                return
@@ -0,0 +1,169 @@
+"""
+Moteur de particules vectorisé (NumPy).
+
+Toutes les particules d'une scène vivent dans un seul tableau
+« struct-of-arrays » : une colonne par champ (position, vitesse, vie,
+taille, teinte). L'émission, l'intégration et le compactage des
+particules mortes se font en quelques opérations sur tableaux, quel que
+soit le nombre de particules. Le rendu passe par un cache de petits
+sprites pré-rendus (teinte quantifiée, taille, mode de couleur) et un
+unique appel à Surface.blits.
+"""
+import math
+
+import numpy as np
+import pygame
+
+from . import colors
+
+# colonnes du tableau de particules
+X, Y, VX, VY, LIFE, HUE, W, H, WHITE = range(9)
+FIELDS = 9
+
+# quantification des sprites : 256 teintes, tailles < 64 px
+HUE_BUCKETS = 256
+MAX_SIZE = 64
+
+
+class ParticleSystem:
+    """
+    Population de particules soumises à la gravité.
+
+    shape = "rect"   : rectangles w x h centrés (scènes « music speed » et « rotation »)
+    shape = "circle" : disques de rayon w (scènes « race »)
+    """
+
+    def __init__(self, gravity, jitter, sat, val, shape="rect", seed=None, capacity=1024):
+        self.gravity = gravity
+        self.jitter = jitter
+        self.sat, self.val = sat, val
+        self.shape = shape
+        self.rng = np.random.default_rng(seed)
+        self.count = 0
+        self._data = np.zeros((capacity, FIELDS))
+        # tampons réutilisés à chaque frame : le compactage n'alloue rien
+        self._spare = np.zeros_like(self._data)
+        self._alive = np.zeros(capacity, dtype=bool)
+        # sprites pré-rendus par (blanc, teinte quantifiée, w, h)
+        self._sprites = {}
+
+    def __len__(self):
+        return self.count
+
+    def _reserve(self, n):
+        """Renvoie les n lignes libres suivantes, en agrandissant les tampons si besoin."""
+        needed = self.count + n
+        capacity = len(self._data)
+        if needed > capacity:
+            while capacity < needed:
+                capacity *= 2
+            data = np.zeros((capacity, FIELDS))
+            data[:self.count] = self._data[:self.count]
+            self._data = data
+            self._spare = np.zeros_like(data)
+            self._alive = np.zeros(capacity, dtype=bool)
+        rows = self._data[self.count:needed]
+        self.count = needed
+        return rows
+
+    def emit(self, n, x, y, vx, vy, hue, life, size, height=None, white=False):
+        """
+        Émet n particules d'un coup. x, y, vx, vy, hue : scalaires ou tableaux de n valeurs.
+        life, size, height : intervalles entiers (min, max) inclus ; height=None -> carré/disque.
+        """
+        rows = self._reserve(n)
+        rng = self.rng
+        rows[:, X] = x
+        rows[:, Y] = y
+        rows[:, VX] = vx + rng.uniform(-self.jitter, self.jitter, n)
+        rows[:, VY] = vy + rng.uniform(-self.jitter, self.jitter, n)
+        rows[:, HUE] = hue
+        rows[:, LIFE] = rng.integers(life[0], life[1] + 1, n)
+        rows[:, W] = rng.integers(size[0], size[1] + 1, n)
+        if height is None:
+            rows[:, H] = rows[:, W]
+        else:
+            rows[:, H] = rng.integers(height[0], height[1] + 1, n)
+        rows[:, WHITE] = white
+
+    def emit_radial(self, n, x, y, speed, hue, life, size, height=None, white=False):
+        """Gerbe depuis un point : directions uniformes, vitesse dans [speed[0], speed[1]]."""
+        angle = self.rng.uniform(0, 2 * math.pi, n)
+        v = self.rng.uniform(speed[0], speed[1], n)
+        self.emit(n, x, y, np.cos(angle) * v, np.sin(angle) * v,
+                  hue, life, size, height, white)
+
+    def emit_ring(self, n, cx, cy, radius, speed, hue, life, size, height=None, white=False):
+        """Éclats répartis sur un cercle (arc brisé), projetés vers l'extérieur."""
+        angle = self.rng.uniform(0, 2 * math.pi, n)
+        cos, sin = np.cos(angle), np.sin(angle)
+        vx = cos * self.rng.uniform(speed[0], speed[1], n)
+        vy = sin * self.rng.uniform(speed[0], speed[1], n)
+        self.emit(n, cx + cos * radius, cy + sin * radius, vx, vy,
+                  hue, life, size, height, white)
+
+    def update(self):
+        n = self.count
+        if not n:
+            return
+        d = self._data[:n]
+        d[:, VY] += self.gravity
+        d[:, X] += d[:, VX]
+        d[:, Y] += d[:, VY]
+        d[:, LIFE] -= 1
+
+        # compactage : on recopie les vivantes dans le tampon de rechange, puis on échange
+        alive = self._alive[:n]
+        np.greater(d[:, LIFE], 0, out=alive)
+        k = int(np.count_nonzero(alive))
+        if k < n:
+            np.compress(alive, d, axis=0, out=self._spare[:k])
+            self._data, self._spare = self._spare, self._data
+            self.count = k
+
+    def clear(self):
+        self.count = 0
+
+    def _render_sprite(self, key):
+        """Pré-rend le sprite d'une clé (blanc, teinte quantifiée, w, h)."""
+        rest, h = divmod(key, MAX_SIZE)
+        rest, w = divmod(rest, MAX_SIZE)
+        white, bucket = divmod(rest, HUE_BUCKETS)
+        if white:
+            color = (255, 255, 255)
+        else:
+            # bucket / HUE_BUCKETS tombe exactement sur une entrée de la table
+            color = colors.hue_table(self.sat, self.val)(bucket / HUE_BUCKETS)
+        if self.shape == "circle":
+            sprite = pygame.Surface((2 * w + 1, 2 * w + 1))
+            sprite.set_colorkey((0, 0, 0), pygame.RLEACCEL)
+            pygame.draw.circle(sprite, color, (w, w), w)
+        else:
+            sprite = pygame.Surface((w, h))
+            sprite.fill(color)
+        return sprite
+
+    def draw(self, surf):
+        """Toute la population en un seul appel Surface.blits, via le cache de sprites."""
+        n = self.count
+        if not n:
+            return
+        d = self._data[:n]
+        w = d[:, W].astype(np.int64)
+        h = d[:, H].astype(np.int64)
+        bucket = np.rint(d[:, HUE] * HUE_BUCKETS).astype(np.int64) % HUE_BUCKETS
+        keys = ((d[:, WHITE].astype(np.int64) * HUE_BUCKETS + bucket) * MAX_SIZE + w) * MAX_SIZE + h
+        if self.shape == "circle":
+            px = d[:, X].astype(np.int64) - w
+            py = d[:, Y].astype(np.int64) - w
+        else:
+            px = (d[:, X] - w / 2).astype(np.int64)
+            py = (d[:, Y] - h / 2).astype(np.int64)
+
+        sprites = self._sprites
+        for key in np.unique(keys).tolist():
+            if key not in sprites:
+                sprites[key] = self._render_sprite(key)
+        # séquence (sprite, (x, y)) construite en C par zip/map, sans boucle Python
+        surf.blits(zip(map(sprites.__getitem__, keys.tolist()), zip(px.tolist(), py.tolist())),
+                   doreturn=False)
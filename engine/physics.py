@@ -0,0 +1,276 @@
+"""
+Noyau physique commun des scènes : balles, anneaux, chocs.
+
+Une balle (Body) tombe sous la gravité et avance de sa vitesse multipliée
+par son `time_scale`. Un anneau (Ring) la retient à l'intérieur, sauf dans
+son ouverture éventuelle ; le rebond la recale sur le bord intérieur et
+réfléchit sa vitesse sur la normale. Les fonctions de choc traitent deux
+balles mobiles (collide) ou une balle contre une balle immobile (push_off).
+
+Le contact avec un anneau est continu (Ring.sweep) : sur le segment parcouru
+pendant le pas, on calcule l'instant exact où la balle atteint le bord
+(time_of_impact), on teste l'ouverture à cet instant (elle tourne de `spin`
+pendant le pas), et la balle repart du point de contact pour le reste du
+pas, jusqu'à MAX_BOUNCES rebonds. Une balle rapide (time_scale élevé) ne
+traverse donc plus un anneau fin et ne manque plus une ouverture. Une balle
+qui commence son pas au-delà du bord hors de l'ouverture (poussée par un
+choc entre balles) y est d'abord recalée, comme le faisaient les scènes
+d'origine, qu'elle s'éloigne ou non.
+
+Le noyau ne joue ni son, ni accord, ni particules : il renvoie ce qui s'est
+passé, et la scène décide de l'effet.
+
+Les angles sont ceux de l'écran (y vers le bas) : atan2(-dy, dx), dans [0, 2π).
+screen_angles et Ring.in_gap_many font le même calcul sur des tableaux
+NumPy (voir engine.swarm).
+"""
+import math
+
+import numpy as np
+
+TAU = 2 * math.pi
+
+# rebonds au plus sur un anneau en un pas (au-delà, la balle s'arrête au point de contact)
+MAX_BOUNCES = 8
+
+
+def screen_angle(dx, dy):
+    """Angle à l'écran du vecteur (dx, dy), dans [0, 2π)."""
+    return (math.atan2(-dy, dx) + TAU) % TAU
+
+
+def screen_angles(dx, dy):
+    """screen_angle sur des tableaux."""
+    return (np.arctan2(-dy, dx) + TAU) % TAU
+
+
+def time_of_impact(px, py, dx, dy, reach):
+    """
+    Fraction t du déplacement (dx, dy), dans ]0, 1], où un point parti de
+    (px, py) (par rapport au centre) atteint la distance `reach` en
+    s'éloignant ; None s'il ne l'atteint pas. Un point déjà au-delà qui
+    s'éloigne encore la touche tout de suite (t = 0).
+    """
+    b = px * dx + py * dy
+    c = px * px + py * py - reach * reach
+    if c >= 0 and b > 0:
+        return 0.0
+    a = dx * dx + dy * dy
+    disc = b * b - a * c
+    if a == 0 or disc < 0:
+        return None
+    root = math.sqrt(disc)
+    # plus grande racine de a t² + 2 b t + c, sans soustraction de termes voisins
+    t = -c / (b + root) if b > 0 else (root - b) / a
+    return t if 0 < t <= 1 else None
+
+
+def times_of_impact(px, py, dx, dy, reach):
+    """time_of_impact sur des tableaux : inf là où il n'y a pas de contact."""
+    b = px * dx + py * dy
+    c = px * px + py * py - reach * reach
+    a = dx * dx + dy * dy
+    disc = b * b - a * c
+    root = np.sqrt(np.maximum(disc, 0.0))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t = np.where(b > 0, -c / (b + root), (root - b) / a)
+    outward = (c >= 0) & (b > 0)
+    hit = outward | ((a > 0) & (disc >= 0) & (t > 0) & (t <= 1))
+    return np.where(outward, 0.0, np.where(hit, t, np.inf))
+
+
+class Body:
+    def __init__(self, x, y, radius, vx=0.0, vy=0.0, time_scale=1.0):
+        self.x, self.y = x, y
+        self.vx, self.vy = vx, vy
+        self.radius = radius
+        self.time_scale = time_scale
+
+    def integrate(self, gravity):
+        """Un pas : gravité puis déplacement."""
+        self.vy += gravity
+        self.x += self.vx * self.time_scale
+        self.y += self.vy * self.time_scale
+
+    def reflect(self, nx, ny):
+        """Réflexion de la vitesse sur la normale (nx, ny) ; renvoie la composante normale d'avant."""
+        v_dot_n = self.vx * nx + self.vy * ny
+        self.vx -= 2 * v_dot_n * nx
+        self.vy -= 2 * v_dot_n * ny
+        return v_dot_n
+
+
+class Ring:
+    """
+    Anneau qui retient les balles à l'intérieur.
+
+    gap_center : angle du milieu de l'ouverture
+    gap_width  : largeur de l'ouverture (0 : anneau fermé)
+    """
+
+    def __init__(self, x, y, radius, width, gap_center=0.0, gap_width=0.0):
+        self.x, self.y = x, y
+        self.radius, self.width = radius, width
+        self.gap_width = gap_width
+        self.set_gap(gap_center)
+
+    def set_gap(self, gap_center, spin=0.0):
+        """Place l'ouverture ; `spin` : de combien elle a tourné pendant le pas (pour sweep)."""
+        self.gap_center = gap_center
+        self.gap_start = (gap_center - self.gap_width / 2) % TAU
+        self.gap_end = (gap_center + self.gap_width / 2) % TAU
+        self.spin = spin
+
+    def in_gap(self, angle, t=1.0):
+        """
+        L'angle est-il dans l'ouverture (bornes comprises) ? `t` : instant
+        dans le pas écoulé (0 : début, 1 : maintenant), l'ouverture ayant
+        tourné de `spin` pendant le pas.
+        """
+        if not self.gap_width:
+            return False
+        if t < 1 and self.spin:
+            # ouverture à l'instant t = ouverture actuelle tournée de -spin (1 - t)
+            angle = (angle + self.spin * (1 - t)) % TAU
+        if self.gap_start < self.gap_end:
+            return self.gap_start <= angle <= self.gap_end
+        # ouverture à cheval sur 0
+        return angle >= self.gap_start or angle <= self.gap_end
+
+    def in_gap_many(self, angles, t=1.0):
+        """in_gap sur un tableau d'angles (et d'instants) : tableau de booléens."""
+        if not self.gap_width:
+            return np.zeros(len(angles), dtype=bool)
+        if self.spin:
+            angles = (angles + self.spin * (1 - np.asarray(t))) % TAU
+        if self.gap_start < self.gap_end:
+            return (angles >= self.gap_start) & (angles <= self.gap_end)
+        return (angles >= self.gap_start) | (angles <= self.gap_end)
+
+    def offset(self, body):
+        """(dx, dy, distance) de la balle par rapport au centre."""
+        dx, dy = body.x - self.x, body.y - self.y
+        return dx, dy, math.hypot(dx, dy)
+
+    def sweep(self, body, x0, y0, max_bounces=MAX_BOUNCES):
+        """
+        Contact continu pendant le pas qui vient d'amener la balle de (x0, y0)
+        à sa position actuelle, en ligne droite.
+
+        Au premier contact avec le bord, si l'ouverture est là à cet instant,
+        la balle sort et finit son pas ; sinon elle rebondit (vitesse
+        réfléchie) et repart du point de contact pour le reste du pas.
+        Une balle partie au-delà du bord, hors de l'ouverture, est d'abord
+        ramenée sur le bord ; le pas repart de là.
+        Renvoie (rebonds, sortie) : la liste des rebonds (x, y du contact,
+        nx, ny, vx, vy d'avant la réflexion) et l'instant (fraction du pas)
+        du passage par l'ouverture, ou None.
+        """
+        reach = self.radius - body.radius
+        px, py = x0 - self.x, y0 - self.y
+        dx, dy = body.x - x0, body.y - y0
+        start = math.hypot(px, py)
+        clamped = start > reach and not self.in_gap(screen_angle(px, py), 0.0)
+        if clamped:
+            px, py = px * reach / start, py * reach / start
+        elapsed = 0.0
+        hits = []
+        exit_time = None
+        while True:
+            t = time_of_impact(px, py, dx, dy, reach)
+            if t is None:
+                break
+            now = elapsed + (1 - elapsed) * t
+            hx, hy = px + dx * t, py + dy * t
+            if self.in_gap(screen_angle(hx, hy), now):
+                exit_time = now
+                break
+            dist = math.hypot(hx, hy)
+            nx, ny = hx / dist, hy / dist
+            px, py = nx * reach, ny * reach
+            vx, vy = body.vx, body.vy
+            body.reflect(nx, ny)
+            hits.append((self.x + px, self.y + py, nx, ny, vx, vy))
+            # reste du déplacement, réfléchi lui aussi
+            rest = 1 - t
+            d_dot_n = dx * nx + dy * ny
+            dx = (dx - 2 * d_dot_n * nx) * rest
+            dy = (dy - 2 * d_dot_n * ny) * rest
+            elapsed = now
+            if len(hits) >= max_bounces:
+                dx = dy = 0.0
+                break
+        if hits or clamped:
+            body.x = self.x + px + dx
+            body.y = self.y + py + dy
+        return hits, exit_time
+
+
+class SpringRing(Ring):
+    """Anneau monté sur ressort : un choc le déplace, il revient à sa position de repos."""
+
+    def __init__(self, x, y, radius, width, gap_center=0.0, gap_width=0.0):
+        super().__init__(x, y, radius, width, gap_center, gap_width)
+        self.base_x, self.base_y = x, y
+        self.vx, self.vy = 0.0, 0.0
+
+    def shock(self, nx, ny, force):
+        """Projette l'anneau dans la direction (nx, ny)."""
+        self.vx += nx * force
+        self.vy += ny * force
+
+    def relax(self, stiffness, damping):
+        """Un pas de ressort amorti vers la position de repos."""
+        self.vx += (self.base_x - self.x) * stiffness
+        self.vy += (self.base_y - self.y) * stiffness
+        self.vx *= damping
+        self.vy *= damping
+        self.x += self.vx
+        self.y += self.vy
+
+
+def collide(b1, b2):
+    """
+    Choc élastique entre deux balles de même masse : séparation de la moitié
+    du chevauchement chacune, puis échange des vitesses normales si elles se
+    rapprochent. Renvoie True si les vitesses ont changé.
+    """
+    dx = b2.x - b1.x
+    dy = b2.y - b1.y
+    dist = math.hypot(dx, dy)
+    min_dist = b1.radius + b2.radius
+    if dist >= min_dist or dist == 0:
+        return False
+    overlap = (min_dist - dist) / 2
+    nx = dx / dist
+    ny = dy / dist
+    b1.x -= nx * overlap
+    b1.y -= ny * overlap
+    b2.x += nx * overlap
+    b2.y += ny * overlap
+
+    v_dot_n = (b2.vx - b1.vx) * nx + (b2.vy - b1.vy) * ny
+    if v_dot_n >= 0:
+        return False
+    b1.vx += v_dot_n * nx
+    b1.vy += v_dot_n * ny
+    b2.vx -= v_dot_n * nx
+    b2.vy -= v_dot_n * ny
+    return True
+
+
+def push_off(body, other):
+    """
+    Choc contre une balle immobile : la balle recule de la moitié du
+    chevauchement et rebondit. Renvoie True s'il y a eu choc.
+    """
+    dx, dy = body.x - other.x, body.y - other.y
+    d = math.hypot(dx, dy)
+    if not 0 < d < body.radius + other.radius:
+        return False
+    nx, ny = dx / d, dy / d
+    overlap = (body.radius + other.radius - d) / 2
+    body.x += nx * overlap
+    body.y += ny * overlap
+    body.reflect(nx, ny)
+    return True
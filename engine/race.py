@@ -0,0 +1,330 @@
+"""
+Scènes « race » : deux balles dans des anneaux concentriques.
+
+Chaque anneau a une ouverture qui tourne ; une balle qui sort par
+l'ouverture détruit l'anneau et marque un point. Les anneaux restants se
+resserrent vers le centre. Chaque rebond sur un anneau joue l'accord
+suivant du morceau (avec un délai minimal par balle).
+
+RaceScene fait toute la partie. Une scène de course la dérive et déclare
+ses réglages (attributs de classe), ses deux balles et les couleurs de ses
+anneaux (méthodes init_arc, update_arc, arc_color).
+
+Sans écran (moteur sans tête, voir engine.seeds), seule la physique tourne :
+ni police, ni interface, ni particules, ni couleurs animées. Les tirages
+aléatoires restent les mêmes : une graine donne la même partie, affichée
+ou non.
+"""
+import math
+from collections import deque
+
+import pygame
+
+from . import hud, scene
+from .arcs import ArcIndex
+from .particles import ParticleSystem
+from .physics import MAX_BOUNCES, TAU, Body, Ring, collide, screen_angle, time_of_impact
+
+
+class Arc(Ring):
+    def __init__(self, x, y, radius, width, gap_center, gap_width):
+        super().__init__(x, y, radius, width, gap_center, gap_width)
+        # teinte des particules quand l'anneau est détruit
+        self.hue = 0.0
+
+    def rotate(self, speed):
+        self.set_gap((self.gap_center + speed) % TAU, speed)
+
+    def exits(self, ball):
+        """
+        La balle est-elle sortie par l'ouverture : franchie pendant le pas
+        (Ball.update), ou bord intérieur dépassé dans l'ouverture à la fin ?
+        """
+        if self in ball.crossed:
+            return True
+        dx, dy, dist = self.offset(ball)
+        return dist > self.radius - ball.radius and self.in_gap(screen_angle(dx, dy))
+
+    def draw(self, surf, color):
+        r = pygame.Rect(self.x - self.radius, self.y - self.radius, 2 * self.radius, 2 * self.radius)
+        if self.gap_start < self.gap_end:
+            pygame.draw.arc(surf, color, r, self.gap_end, TAU, self.width)
+            pygame.draw.arc(surf, color, r, 0, self.gap_start, self.width)
+        else:
+            pygame.draw.arc(surf, color, r, self.gap_end, self.gap_start, self.width)
+
+
+class Ball(Body):
+    def __init__(self, x, y, radius, vx, vy, time_scale, border_color, label, label_surface):
+        super().__init__(x, y, radius, vx, vy, time_scale)
+        self.border_color, self.label = border_color, label
+        self.destroyed = 0
+        self.last_note_time = -math.inf
+        self.note_cooldown = 0.1
+        self.trail = deque(maxlen=9)
+        self.crossed = []  # anneaux franchis par leur ouverture au dernier pas
+        self.label_surface = label_surface  # le texte ne change jamais
+
+    def update(self, arcs, gravity, max_view):
+        """
+        Un pas, en contact continu avec les anneaux (voir physics.Ring.sweep) ;
+        renvoie le nombre de rebonds. Les anneaux franchis par leur ouverture
+        pendant le pas sont dans self.crossed. Une balle partie au-delà d'un
+        anneau hors de son ouverture (poussée par l'autre balle, ou anneau
+        resserré) est d'abord ramenée sur son bord, comme dans les scènes
+        d'origine, même si elle revient déjà vers le centre.
+        """
+        x0, y0 = self.x, self.y
+        self.integrate(gravity)
+        self.crossed = []
+        cx, cy = arcs.cx, arcs.cy
+        px, py, clamped = self._clamp(arcs, x0 - cx, y0 - cy, max_view)
+        dx, dy = self.x - x0, self.y - y0
+        candidates = self._reachable(arcs, px, py, dx, dy, max_view)
+        elapsed = 0.0
+        bounces = 0
+        while candidates:
+            # premier contact du reste du pas ; à égalité, le plus grand anneau
+            first, first_t = None, None
+            for arc in candidates:
+                t = time_of_impact(px, py, dx, dy, arc.radius - self.radius)
+                if t is not None and (first_t is None or t < first_t):
+                    first, first_t = arc, t
+            if first is None:
+                break
+            t = first_t
+            now = elapsed + (1 - elapsed) * t
+            hx, hy = px + dx * t, py + dy * t
+            if first.in_gap(screen_angle(hx, hy), now):
+                # passage par l'ouverture : l'anneau sera cassé, la balle continue
+                self.crossed.append(first)
+                candidates.remove(first)
+                continue
+            dist = math.hypot(hx, hy)
+            nx, ny = hx / dist, hy / dist
+            px, py = nx * (first.radius - self.radius), ny * (first.radius - self.radius)
+            v_dot_n = self.reflect(nx, ny)
+            # rebond trop mou : on relance la balle
+            if abs(v_dot_n) < 3:
+                self.vx += nx * 10
+                self.vy += ny * 10
+            bounces += 1
+            elapsed = now
+            if bounces >= MAX_BOUNCES:
+                dx = dy = 0.0
+                break
+            # reste du pas à la nouvelle vitesse
+            rest = (1 - elapsed) * self.time_scale
+            dx, dy = self.vx * rest, self.vy * rest
+            # la vitesse a changé (rebond, relance) : le reste du pas peut aller plus loin
+            candidates = [arc for arc in self._reachable(arcs, px, py, dx, dy, max_view)
+                          if arc not in self.crossed]
+        if bounces or clamped:
+            self.x, self.y = cx + px + dx, cy + py + dy
+        self.trail.append((self.x, self.y))
+        return bounces
+
+    def _clamp(self, arcs, px, py, max_view):
+        """
+        (px, py) (relatif au centre) ramené sur le bord intérieur du plus petit
+        anneau visible dépassé hors de son ouverture ; renvoie (px, py, recalée ?).
+        """
+        dist = math.hypot(px, py)
+        inner = None
+        angle = screen_angle(px, py)
+        for arc in arcs.inward_from(dist + self.radius):
+            if arc.radius - arc.width / 2 <= max_view and not arc.in_gap(angle, 0.0):
+                inner = arc  # du plus grand au plus petit : le dernier est le plus proche du centre
+        if inner is None or dist <= inner.radius - self.radius:
+            return px, py, False
+        reach = inner.radius - self.radius
+        return px * reach / dist, py * reach / dist, True
+
+    def _reachable(self, arcs, px, py, dx, dy, max_view):
+        """Anneaux visibles que la balle peut toucher de (px, py) à (px + dx, py + dy) (relatifs au centre)."""
+        # la distance au centre est maximale à un bout du segment
+        reach = max(math.hypot(px, py), math.hypot(px + dx, py + dy)) + self.radius
+        return [arc for arc in arcs.inward_from(reach) if arc.radius - arc.width / 2 <= max_view]
+
+    def draw(self, surf, sprites):
+        for idx, (tx, ty) in enumerate(self.trail):
+            alpha = int(255 * (idx / len(self.trail)))
+            sprites.draw_disc(surf, tx, ty, self.radius, self.border_color, alpha)
+        sprites.draw_ball(surf, self.x, self.y, self.radius, (0, 0, 0), self.border_color, 5)
+        ls = self.label_surface
+        surf.blit(ls, ls.get_rect(center=(int(self.x), int(self.y))))
+
+
+class RaceScene(scene.Scene):
+    background = (10, 10, 10)
+
+    duration = 30            # durée de la partie (s), affichée en compte à rebours
+    gravity = 0.3
+    time_scale = 0.3
+    start_velocity = (20, 15)
+    start_jitter = 0.0       # écart max (degrés) de la direction de départ, tiré par graine
+    rotation_speed = 0.01    # rotation des ouvertures (radians par pas)
+    arc_count = 160
+    arc_width = 9
+    arc_spacing = 25
+    gap_shift = 0.1          # décalage de l'ouverture d'un anneau au suivant
+    gap_width = math.pi / 2.5
+    base_min_radius = 200    # rayon vers lequel se resserrent les anneaux
+    shrink_factor = 0.01
+    max_shrink = 5.0
+    saturation, value = 0.9, 1  # couleurs des particules
+    balls = ()               # (x, y) relatifs au centre, rayon, couleur, nom, effet sonore
+    sounds = {}              # effet sonore -> (fichier relatif à la racine, volume)
+    score_formats = ("{label} {score}", "{label}  {score}")
+    text_color = (255, 255, 255)
+
+    def __init__(self, engine):
+        super().__init__(engine)
+        self.max_view_radius = math.hypot(self.width / 2, self.height / 2) + self.arc_width
+        # casses d'anneaux : (temps, indice de la balle)
+        self.breaks = []
+
+        # sons d'effet (décodés une fois ; les anneaux cassés dans la même frame partagent une voix)
+        self.sfx = engine.open_sfx()
+        for name, (path, volume) in self.sounds.items():
+            self.sfx.load(name, scene.asset(path), volume=volume)
+
+        self.prepare()
+        particles_seed = self.rng.getrandbits(64)
+        self.particles = None
+        if not self.headless:
+            self.particles = ParticleSystem(self.gravity, jitter=3, sat=self.saturation, val=self.value,
+                                            shape="circle", seed=particles_seed)
+            self.init_ui()
+
+        self.arcs = ArcIndex(self.width / 2, self.height / 2)
+        cx, cy = self.arcs.cx, self.arcs.cy
+        for i in range(self.arc_count):
+            radius = self.base_min_radius + i * (self.arc_width + self.arc_spacing)
+            arc = Arc(cx, cy, radius, self.arc_width, self.gap_shift * i, self.gap_width)
+            self.init_arc(arc)
+            self.arcs.add(arc)
+        self.players = []
+        self.effects = {}
+        for (dx, dy), radius, color, label, effect in self.balls:
+            vx, vy = self.start_velocity
+            if self.start_jitter:
+                # même vitesse, direction tournée au hasard : chaque graine donne une autre course
+                a = math.radians(self.rng.uniform(-self.start_jitter, self.start_jitter))
+                vx, vy = vx * math.cos(a) - vy * math.sin(a), vx * math.sin(a) + vy * math.cos(a)
+            label_surface = None if self.headless else self.font_ball.render(label, True, "white")
+            ball = Ball(cx + dx, cy + dy, radius, vx, vy, self.time_scale, color, label, label_surface)
+            self.players.append(ball)
+            self.effects[ball] = effect
+
+    def init_ui(self):
+        self.font_ball = pygame.font.SysFont("calibri", 45, bold=True)
+        self.font_ui = pygame.font.SysFont("Ebrima", 50, bold=True)
+        self.font_time = pygame.font.SysFont("Ebrima", 33)
+
+        # UI : fonds translucides rendus une fois, textes re-rendus seulement quand ils changent
+        box_w, box_h, spacing = 200, 70, 40
+        center_y = self.height // 2 - 550
+        self.panels = [
+            hud.Panel((self.width // 2 - box_w - spacing // 2, center_y, box_w, box_h), self.balls[0][2], 128,
+                      self.font_ui, self.text_color, border_radius=5),
+            hud.Panel((self.width // 2 + spacing // 2, center_y, box_w, box_h), self.balls[1][2], 128,
+                      self.font_ui, self.text_color, border_radius=5),
+        ]
+        self.time_panel = hud.Panel(((self.width - 270) // 2, center_y + box_h + 15, 270, 55), (255, 255, 255),
+                                    200, self.font_time, "black", border_radius=5)
+
+    # --- couleurs des anneaux, propres à chaque scène ---
+
+    def prepare(self):
+        """Avant les particules et les anneaux (palette tirée au hasard, par exemple)."""
+
+    def init_arc(self, arc):
+        """Couleur de départ d'un anneau."""
+
+    def update_colors(self):
+        """Une fois par pas, avant la mise à jour des anneaux."""
+
+    def update_arc(self, arc):
+        """Couleur d'un anneau à chaque pas."""
+
+    def arc_color(self, arc):
+        raise NotImplementedError
+
+    # --- partie ---
+
+    def step(self):
+        headless = self.headless
+        if not headless:
+            self.update_colors()
+        for arc in self.arcs:
+            arc.rotate(self.rotation_speed)
+            if not headless:
+                self.update_arc(arc)
+        now = self.sim.time
+        music = self.music
+        for ball in self.players:
+            if ball.update(self.arcs, self.gravity, self.max_view_radius) and music is not None:
+                if now - ball.last_note_time >= ball.note_cooldown and music.play_next():
+                    ball.last_note_time = now
+        self.handle_collisions()
+        self.break_arcs()
+        if not headless:
+            self.particles.update()
+        self.shrink_arcs()
+
+    def handle_collisions(self):
+        b1, b2 = self.players
+        if collide(b1, b2) and not self.headless:
+            cx = (b1.x + b2.x) / 2
+            cy = (b1.y + b2.y) / 2
+            self.particles.emit_radial(25, cx, cy, speed=(1, 3), hue=0,
+                                       life=(15, 30), size=(2, 4), white=True)
+
+    def break_arcs(self):
+        # seuls les anneaux déjà atteints par une balle (rayon <= distance + rayon de la balle)
+        # peuvent être franchis : l'index les donne par dichotomie
+        arcs = self.arcs
+        destroyed = {}
+        for ball in self.players:
+            for arc in ball.crossed:
+                destroyed.setdefault(arc, ball)
+            reach = arcs.distance(ball.x, ball.y) + ball.radius
+            for arc in arcs.inward_from(reach):
+                if arc not in destroyed and arc.exits(ball):
+                    destroyed[arc] = ball
+        for arc in sorted(destroyed, key=lambda a: a.radius):
+            destroyed_by = destroyed[arc]
+            arcs.remove(arc)
+            # effet sonore de la balle qui a cassé l'anneau
+            self.sfx.trigger(self.effects[destroyed_by])
+            destroyed_by.destroyed += 1
+            self.breaks.append((self.sim.time, self.players.index(destroyed_by)))
+            if not self.headless:
+                self.particles.emit_ring(50, arc.x, arc.y, arc.radius, speed=(1, 4), hue=arc.hue,
+                                         life=(30, 60), size=(3, 6))
+
+    def shrink_arcs(self):
+        arcs = self.arcs
+        if not arcs:
+            return
+        current_min = arcs[0].radius  # index trié : le plus petit anneau est en tête
+        delta = (current_min - self.base_min_radius) * self.shrink_factor
+        delta = max(0.0, min(delta, self.max_shrink))
+        for arc in arcs:
+            arc.radius -= delta
+
+    def time_left(self):
+        return max(0.0, self.duration - self.sim.time)
+
+    def draw(self, screen):
+        screen.fill(self.background)
+        for arc in self.arcs:
+            if arc.radius - arc.width / 2 <= self.max_view_radius:
+                arc.draw(screen, self.arc_color(arc))
+        self.particles.draw(screen)
+        for ball in self.players:
+            ball.draw(screen, self.sprites)
+        for panel, fmt, ball in zip(self.panels, self.score_formats, self.players):
+            panel.draw(screen, fmt.format(label=ball.label, score=ball.destroyed))
+        self.time_panel.draw(screen, f"Time Left: {self.time_left():.1f}s")
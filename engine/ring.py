@@ -0,0 +1,143 @@
+"""
+Anneau extérieur avec ouverture, pré-rendu et pré-tourné.
+
+La forme de l'anneau ne change que par rotation de l'ouverture et par la
+teinte. On calcule donc une fois la couverture anti-aliasée des pixels de
+l'anneau, stockée dans des surfaces 8 bits palettisées dont l'indice =
+couverture. Teinter l'anneau revient à changer la palette.
+
+Seule la bande de l'anneau est gardée, découpée en tuiles de `TILE` pixels :
+l'anneau plein (sans ouverture) est rendu une fois, et chaque variante
+tournée (à la résolution angulaire `angle_step` degrés) ne stocke que les
+quelques tuiles autour de son ouverture (~10 Ko pour un rayon de 500, au
+lieu du carré entier). Dessiner l'anneau coûte un seul appel à blits par
+frame. Le cache des variantes (LRU) garde par défaut un tour complet
+(360 / angle_step variantes, ~5 Mo pour un pas de 1°) : un anneau qui tourne
+ne rend chaque variante qu'une fois ; `max_variants` le borne au besoin.
+
+Les bords anti-aliasés sont mélangés à la couleur fixe `background`, pas à
+ce qu'il y a sous l'anneau : les pixels de bord sont opaques (la palette
+n'a pas d'alpha). Le fond sous l'anneau doit donc être uni et de cette
+couleur ; sur un calque translucide dessiné dessous (traînée), les pixels
+de bord (un pixel au plus) tirent vers `background` au lieu du calque.
+"""
+import math
+from collections import OrderedDict
+
+import numpy as np
+import pygame
+
+# côté des tuiles de la bande (pixels)
+TILE = 32
+
+
+class RingRenderer:
+    def __init__(self, radius, width, gap_angle, angle_step=1.0,
+                 background=(0, 0, 0), max_variants=None):
+        """
+        radius, width : comme pygame.draw.arc (l'épaisseur est prise vers l'intérieur)
+        gap_angle     : largeur de l'ouverture, en radians
+        background    : couleur de fond contre laquelle les bords sont lissés
+        max_variants  : taille du cache des variantes (par défaut, un tour complet)
+        """
+        self.radius = radius
+        self.width = width
+        self.gap_angle = gap_angle
+        self.steps = max(1, int(round(360 / angle_step)))
+        self.background = background
+        self.max_variants = max_variants or self.steps
+        self._variants = OrderedDict()
+        self._color = None
+        self._palette = None
+
+        # géométrie fixe : pixels de la bande de l'anneau et leur couverture radiale
+        self.half = int(math.ceil(radius)) + 2
+        size = 2 * self.half
+        coords = np.arange(size) + 0.5 - self.half
+        dx, dy = np.meshgrid(coords, coords, indexing="ij")
+        dist = np.hypot(dx, dy)
+        radial = np.clip(np.minimum(dist - (radius - width), radius - dist) + 0.5, 0.0, 1.0)
+        xs, ys = np.nonzero(radial > 0)
+        self._xs, self._ys = xs, ys
+        self._dist = dist[xs, ys]
+        self._radial = radial[xs, ys]
+        # angle « pygame » : sens trigonométrique, y vers le haut
+        self._theta = np.arctan2(-dy[xs, ys], dx[xs, ys])
+
+        # tuiles touchées par la bande, et tuile de chaque pixel
+        side = -(-size // TILE)
+        keys, self._tile_of = np.unique((xs // TILE) * side + ys // TILE, return_inverse=True)
+        self._tiles = [(int(k // side) * TILE - self.half, int(k % side) * TILE - self.half)
+                       for k in keys]
+        # anneau plein : couverture de référence et tuiles partagées par toutes les variantes
+        self._full = np.rint(self._radial * 255).astype(np.uint8)
+        self._base = self._pack(np.arange(len(keys)), self._full)
+
+    def _pack(self, tiles, coverage):
+        """Surface 8 bits des tuiles `tiles` empilées en colonne, remplies par `coverage`."""
+        slot = np.full(len(self._tiles), -1)
+        slot[tiles] = np.arange(len(tiles))
+        sel = slot[self._tile_of] >= 0
+        surf = pygame.Surface((TILE, TILE * len(tiles)), depth=8)
+        pixels = pygame.surfarray.pixels2d(surf)
+        pixels[self._xs[sel] % TILE, slot[self._tile_of[sel]] * TILE + self._ys[sel] % TILE] = coverage[sel]
+        del pixels
+        surf.set_colorkey(0)
+        return surf
+
+    def _render(self, step):
+        """
+        Variante dont l'ouverture est centrée sur l'angle step * 2π / steps :
+        ses tuiles propres, et la liste des blits (source, décalage, zone).
+        """
+        gap_center = step * 2 * math.pi / self.steps
+        delta = np.abs((self._theta - gap_center + math.pi) % (2 * math.pi) - math.pi)
+        # distance (en pixels d'arc) au bord de l'ouverture -> couverture angulaire
+        angular = np.clip((delta - self.gap_angle / 2) * self._dist + 0.5, 0.0, 1.0)
+        coverage = np.rint(self._radial * angular * 255).astype(np.uint8)
+
+        # seules les tuiles où l'ouverture change quelque chose sont rendues
+        own = np.unique(self._tile_of[coverage != self._full])
+        surf = self._pack(own, coverage) if len(own) else None
+        slots = dict(zip(own.tolist(), range(len(own))))
+        batch = []
+        for tile, offset in enumerate(self._tiles):
+            slot = slots.get(tile)
+            if slot is None:
+                batch.append((self._base, offset, pygame.Rect(0, tile * TILE, TILE, TILE)))
+            else:
+                batch.append((surf, offset, pygame.Rect(0, slot * TILE, TILE, TILE)))
+        return surf, batch
+
+    def variant(self, gap_center):
+        step = int(round(gap_center * self.steps / (2 * math.pi))) % self.steps
+        variants = self._variants
+        entry = variants.get(step)
+        if entry is None:
+            entry = variants[step] = self._render(step)
+            if len(variants) > self.max_variants:
+                variants.popitem(last=False)
+        else:
+            variants.move_to_end(step)
+        return entry
+
+    def _palette_for(self, color):
+        if color != self._color:
+            br, bg, bb = self.background
+            r, g, b = color
+            self._palette = [(br + (r - br) * i // 255,
+                              bg + (g - bg) * i // 255,
+                              bb + (b - bb) * i // 255) for i in range(256)]
+            self._color = color
+        return self._palette
+
+    def draw(self, surf, x, y, gap_center, color):
+        """Dessine l'anneau centré en (x, y), ouverture centrée sur `gap_center` (radians)."""
+        own, batch = self.variant(gap_center)
+        palette = self._palette_for(color)
+        self._base.set_palette(palette)
+        if own is not None:
+            own.set_palette(palette)
+        x, y = int(x), int(y)
+        surf.blits([(source, (x + dx, y + dy), area) for source, (dx, dy), area in batch],
+                   doreturn=False)
@@ -0,0 +1,206 @@
+"""
+Moteur des scènes : boucle à pas fixe, rendu, export, musique et effets.
+
+Une scène est un plugin déclaratif : son script ne fait rien à l'import. Il
+déclare ses constantes, puis une classe dérivée de Scene dont les
+attributs de classe décrivent la fenêtre (size, fps, background) et le
+morceau (song), et dont les méthodes construisent le monde (__init__),
+avancent d'un pas fixe (step) et dessinent une frame (draw). C'est run()
+qui ouvre pygame, la sortie MIDI, l'export et la bande-son, puis fait
+tourner la boucle :
+
+    if __name__ == "__main__":
+        scene.run(FreezeScene)
+
+HeadlessEngine fait tourner la physique seule, sans fenêtre, son ni MIDI
+(`scene.headless` est vrai) : pour simuler des parties en lot.
+
+Les chemins des scènes (morceau, sons, frames) sont relatifs à la racine du
+projet. Un script peut aussi être lancé par son chemin, depuis la racine :
+
+    python -m engine.scene "circles_race_(color).py"
+"""
+import argparse
+import importlib.util
+import os
+import sys
+
+import pygame
+import pygame.midi
+
+from . import export, timeline
+from .sfx import NullMixer, SfxMixer
+from .simclock import SimClock, make_rng, resolve_seed
+from .sprites import SpriteCache
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def asset(path):
+    """Chemin absolu d'un fichier du projet (chemin relatif à la racine)."""
+    return os.path.join(ROOT, path)
+
+
+class Music:
+    """Les accords du morceau, joués dans l'ordre : un par rebond."""
+
+    def __init__(self, chords, soundtrack):
+        self.chords = chords
+        self.soundtrack = soundtrack
+        self.index = 0
+
+    def __len__(self):
+        return len(self.chords)
+
+    def play_next(self):
+        """Joue l'accord suivant (chaque note relâchée après sa durée d'origine) ; False une fois le morceau fini."""
+        if self.index >= len(self.chords):
+            return False
+        i = self.index
+        self.soundtrack.play_chord(self.chords.chord(i), self.chords.durations(i))
+        self.index += 1
+        return True
+
+
+class Scene:
+    size = (1080, 1920)
+    fps = 100
+    background = (0, 0, 0)
+    song = None  # morceau MIDI joué accord par accord (chemin relatif à la racine), ou None
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.width, self.height = self.size
+        self.sim = engine.sim
+        self.rng = engine.rng
+        self.sprites = engine.sprites
+        self.music = engine.music
+        self.headless = engine.screen is None
+
+    def step(self):
+        """Un pas fixe de simulation (l'horloge avance ensuite d'elle-même)."""
+
+    def frame(self):
+        """Après les pas d'une frame, avant son rendu : ce qui suit l'affichage plutôt que la physique."""
+
+    def draw(self, screen):
+        screen.fill(self.background)
+
+    def close(self):
+        pass
+
+
+class Engine:
+    """Ce que le moteur fournit à une scène : horloge, hasard, musique, effets, sprites, écran."""
+
+    def __init__(self, scene_cls):
+        export.init_headless()
+        pygame.init()
+        chords = midi = None
+        if scene_cls.song:
+            pygame.midi.init()
+            # timeline d'accords précompilée, en cache
+            chords = timeline.load(asset(scene_cls.song))
+            midi = export.open_midi_output()
+            chords.set_instruments(midi)
+
+        self.screen = pygame.display.set_mode(scene_cls.size)
+        self.clock = pygame.time.Clock()
+        self.fps = scene_cls.fps
+        self.exporter = export.open_exporter(scene_cls.fps)
+        self.sim = SimClock(scene_cls.fps)
+        self.soundtrack = export.open_soundtrack(self.sim, midi, chords)
+        self.seed = resolve_seed()
+        self.rng = make_rng(self.seed)
+        self.sprites = SpriteCache()
+        self.music = Music(chords, self.soundtrack) if chords is not None else None
+        self.sfx = None
+
+    def open_sfx(self):
+        """Mixeur d'effets de la partie (créé au premier appel) ; fermé par le moteur."""
+        if self.sfx is None:
+            pygame.mixer.init()
+            self.sfx = SfxMixer(self.sim, self.seed, self.soundtrack)
+        return self.sfx
+
+    def run(self, scene):
+        sim, exporter, screen = self.sim, self.exporter, self.screen
+        running = True
+        while running:
+            for e in pygame.event.get():
+                if e.type == pygame.QUIT:
+                    running = False
+
+            # mise à jour à pas fixe (une frame exportée = un pas)
+            steps = 1 if exporter else sim.pending_steps()
+            for _ in range(steps):
+                scene.step()
+                sim.step()
+            if self.sfx is not None:
+                self.sfx.flush()
+            scene.frame()
+
+            scene.draw(screen)
+            if exporter:
+                running = exporter.write(screen)
+            else:
+                pygame.display.flip()
+                self.clock.tick(self.fps)
+
+    def close(self, scene):
+        if self.exporter:
+            self.exporter.close()
+        scene.close()
+        if self.sfx is not None:
+            self.sfx.close()
+        self.soundtrack.close()
+        pygame.quit()
+
+
+class HeadlessEngine:
+    """Moteur sans tête : horloge et hasard seulement, effets muets, pas de morceau ni d'écran."""
+
+    screen = None
+    sprites = None
+    music = None
+
+    def __init__(self, scene_cls, seed):
+        self.fps = scene_cls.fps
+        self.sim = SimClock(scene_cls.fps)
+        self.seed = seed
+        self.rng = make_rng(seed)
+        self.sfx = NullMixer()
+
+    def open_sfx(self):
+        return self.sfx
+
+
+def run(scene_cls):
+    """Joue une scène, en fenêtre ou en export (BOUNCY_EXPORT)."""
+    engine = Engine(scene_cls)
+    scene = scene_cls(engine)
+    try:
+        engine.run(scene)
+    finally:
+        engine.close(scene)
+
+
+def load(path):
+    """Classe de scène (attribut SCENE) d'un script, importé sans le lancer."""
+    name = "scene_" + "".join(c if c.isalnum() else "_" for c in os.path.splitext(os.path.basename(path))[0])
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module.SCENE
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Joue une scène BouncyBalls.")
+    parser.add_argument("scene", help="script de la scène")
+    args = parser.parse_args()
+    run(load(args.scene))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""
+Recherche de graines des scènes « race » : des milliers de parties simulées.
+
+Une graine (BOUNCY_SEED) donne toujours la même partie. Ce module joue des
+parties sans tête (ni rendu, ni son, ni MIDI : la physique seule, voir
+scene.HeadlessEngine) dans un pool de processus, une par graine, sur
+GAME_DURATION secondes, et note pour chacune :
+ - les anneaux cassés par chaque balle à la fin ;
+ - le vainqueur et l'écart final ;
+ - le nombre de changements de meneur ;
+ - l'instant de la première casse.
+
+Le tableau des résultats (CSV, une ligne par graine) est trié selon --sort
+et écrit dans .cache/ ; on y choisit la graine à rendre, par exemple :
+    BOUNCY_SEED=1234 BOUNCY_EXPORT=clip.rgb python "circles_race_(color).py"
+
+En ligne de commande, depuis la racine du projet :
+    python -m engine.seeds "circles_race_(color).py" --races 5000
+    python -m engine.seeds "circles_race_(rainbow).py" --winner Me --sort margin
+"""
+import argparse
+import csv
+import os
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from . import scene
+from .race import RaceScene
+
+# clés de tri : (colonne, ordre décroissant)
+SORTS = {
+    "margin": ("margin", False),          # arrivées serrées d'abord
+    "lead_changes": ("lead_changes", True),
+    "first_break": ("first_break", False),
+    "seed": ("seed", False),
+}
+
+_scene_cls = None
+
+
+def simulate(scene_cls, seed, seconds=None):
+    """Joue une partie sans tête ; renvoie les scores et les casses (temps, indice de la balle)."""
+    engine = scene.HeadlessEngine(scene_cls, seed)
+    race = scene_cls(engine)
+    steps = int(round((scene_cls.duration if seconds is None else seconds) * scene_cls.fps))
+    sim = engine.sim
+    for _ in range(steps):
+        race.step()
+        sim.step()
+    return [ball.destroyed for ball in race.players], race.breaks
+
+
+def summarize(seed, labels, scores, breaks):
+    """Ligne du tableau de résultats d'une partie."""
+    lead_changes = 0
+    leader = None
+    counts = [0] * len(labels)
+    for _, i in breaks:
+        counts[i] += 1
+        best = max(counts)
+        current = counts.index(best) if counts.count(best) == 1 else None
+        # une égalité ne change pas de meneur : seul compte le prochain à passer devant
+        if current is not None:
+            if leader is not None and current != leader:
+                lead_changes += 1
+            leader = current
+    best = max(scores)
+    winner = labels[scores.index(best)] if scores.count(best) == 1 else "tie"
+    row = {"seed": seed}
+    row.update(zip(labels, scores))
+    row.update({
+        "winner": winner,
+        "margin": best - min(scores),
+        "lead_changes": lead_changes,
+        "first_break": round(breaks[0][0], 2) if breaks else None,
+    })
+    return row
+
+
+def labels(scene_cls):
+    return [ball[3] for ball in scene_cls.balls]
+
+
+def _init(path):
+    global _scene_cls
+    _scene_cls = scene.load(path)
+
+
+def _run(seed):
+    scores, breaks = simulate(_scene_cls, seed)
+    return summarize(seed, labels(_scene_cls), scores, breaks)
+
+
+def search(path, seeds, workers=None):
+    """Lignes de résultats des graines `seeds` de la scène `path`, dans l'ordre des graines."""
+    seeds = list(seeds)
+    if len(seeds) > 1 and workers != 1:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init, initargs=(path,)) as pool:
+            return list(pool.map(_run, seeds, chunksize=max(1, len(seeds) // 64)))
+    _init(path)
+    return [_run(seed) for seed in seeds]
+
+
+def sort_rows(rows, key):
+    column, descending = SORTS[key]
+    sign = -1 if descending else 1
+    # parties sans casse en dernier ; à égalité, par graine
+    return sorted(rows, key=lambda row: (row[column] is None, sign * (row[column] or 0), row["seed"]))
+
+
+def write_table(path, rows, columns):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=columns)
+        writer.writeheader()
+        writer.writerows(rows)
+    os.replace(tmp, path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simule des parties « race » par graine et classe les graines.")
+    parser.add_argument("scene", help="script de la scène (circles_race_*.py)")
+    parser.add_argument("--races", type=int, default=1000, help="nombre de graines simulées")
+    parser.add_argument("--start", type=int, default=0, help="première graine")
+    parser.add_argument("--workers", type=int, default=None, help="nombre de processus (par défaut : un par cœur)")
+    parser.add_argument("--winner", help="ne garder que les parties gagnées par cette balle")
+    parser.add_argument("--sort", choices=sorted(SORTS), default="margin")
+    parser.add_argument("--out", help="tableau CSV (par défaut .cache/seeds-<scène>.csv)")
+    parser.add_argument("--top", type=int, default=10, help="lignes affichées")
+    args = parser.parse_args()
+
+    scene_cls = scene.load(args.scene)
+    if not issubclass(scene_cls, RaceScene):
+        parser.error(f"pas une scène « race » : {args.scene}")
+    names = labels(scene_cls)
+    if args.winner is not None and args.winner not in names + ["tie"]:
+        parser.error(f"balle inconnue : {args.winner} (balles : {', '.join(names)}, ou tie)")
+
+    t0 = time.perf_counter()
+    rows = search(args.scene, range(args.start, args.start + args.races), args.workers)
+    elapsed = time.perf_counter() - t0
+
+    wins = Counter(row["winner"] for row in rows)
+    print(f"{len(rows)} parties de {scene_cls.duration} s en {elapsed:.1f} s")
+    for name in names + ["tie"]:
+        print(f"  {name:8s} {wins[name]:6d}  {100 * wins[name] / max(len(rows), 1):5.1f} %")
+
+    if args.winner is not None:
+        rows = [row for row in rows if row["winner"] == args.winner]
+    rows = sort_rows(rows, args.sort)
+    columns = ["seed", *names, "winner", "margin", "lead_changes", "first_break"]
+    stem = os.path.splitext(os.path.basename(args.scene))[0]
+    out = args.out or os.path.join(scene.ROOT, ".cache", f"seeds-{stem}.csv")
+    write_table(out, rows, columns)
+    print(f"{len(rows)} lignes écrites dans {out}")
+
+    print("  ".join(f"{c:>12s}" for c in columns))
+    for row in rows[:args.top]:
+        print("  ".join(f"{'' if row[c] is None else row[c]!s:>12s}" for c in columns))
+
+
+if __name__ == "__main__":
+    main()
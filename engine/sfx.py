@@ -0,0 +1,128 @@
+"""
+Mixeur d'effets sonores à voix limitées.
+
+ - Chaque fichier (MP3 / WAV) est décodé une seule fois en PCM par
+   pygame.mixer.Sound, puis partagé par tous les effets qui l'utilisent.
+ - Les déclenchements d'un même effet pendant une frame sont fusionnés en
+   une seule voix, dont le gain est la somme des gains (plafonnée à 1).
+ - Chaque effet a un nombre maximal de voix simultanées, prises dans un
+   groupe de canaux réservés ; au-delà, le déclenchement est abandonné et
+   compté (rapport sur stderr à la fermeture).
+
+Les voix sont comptées en temps de simulation (durée du son), pas en
+interrogeant les canaux : le résultat est le même en direct et en export.
+Les variantes sont tirées par un générateur propre au mixeur, dérivé de la
+graine de la partie : flush() tourne une fois par frame affichée, il ne
+doit pas consommer le hasard de la simulation (sinon la même graine
+donnerait une autre partie selon la cadence d'affichage).
+"""
+import os
+import random
+import sys
+
+import pygame
+
+_decoded = {}
+
+
+def decode(path):
+    """Son décodé de `path`, partagé entre tous les effets."""
+    key = os.path.abspath(path)
+    sound = _decoded.get(key)
+    if sound is None:
+        sound = _decoded[key] = pygame.mixer.Sound(path)
+    return sound
+
+
+class SfxMixer:
+    def __init__(self, sim, seed, soundtrack=None, channels=16, voices=4):
+        """
+        seed     : graine de la partie (le tirage des variantes en dérive)
+        channels : taille du groupe de canaux réservés aux effets
+        voices   : voix simultanées par effet (par défaut)
+        """
+        self.sim = sim
+        self.rng = random.Random(f"sfx:{seed}")
+        self.soundtrack = soundtrack
+        self.voices = voices
+        if pygame.mixer.get_num_channels() < channels:
+            pygame.mixer.set_num_channels(channels)
+        pygame.mixer.set_reserved(channels)
+        self._channels = [pygame.mixer.Channel(i) for i in range(channels)]
+        self._busy_until = [0.0] * channels  # fin de la voix de chaque canal (temps de simulation)
+        self._owner = [None] * channels      # effet joué par chaque canal
+        self._effects = {}
+        self._pending = {}
+        self.stats = {}  # nom -> [déclenchements, voix jouées, abandons]
+
+    def load(self, name, paths, volume=1.0, voices=None, min_interval=0.0):
+        """
+        Déclare l'effet `name` : un fichier, ou plusieurs variantes tirées au hasard.
+        min_interval : délai minimal (s) entre deux voix de cet effet
+        """
+        if isinstance(paths, str):
+            paths = [paths]
+        variants = [decode(p) for p in paths]
+        self._effects[name] = [variants, volume, voices or self.voices, min_interval, -float("inf")]
+        self.stats[name] = [0, 0, 0]
+
+    def trigger(self, name, gain=1.0):
+        """Demande l'effet `name` ; joué (une fois par frame au plus) au prochain flush()."""
+        pending = self._pending.setdefault(name, [0, 0.0])
+        pending[0] += 1
+        pending[1] += gain
+        self.stats[name][0] += 1
+
+    def flush(self):
+        """Joue les effets demandés depuis la frame précédente. À appeler une fois par frame."""
+        if not self._pending:
+            return
+        now = self.sim.time
+        for name, (count, gain) in self._pending.items():
+            effect = self._effects[name]
+            variants, volume, cap, min_interval, last = effect
+            if now - last < min_interval:
+                continue  # délai voulu entre deux voix : ce n'est pas un abandon
+            active = sum(1 for owner, end in zip(self._owner, self._busy_until)
+                         if owner == name and end > now)
+            free = min(range(len(self._channels)), key=self._busy_until.__getitem__)
+            if active >= cap or self._busy_until[free] > now:
+                self.stats[name][2] += count
+                continue
+            sound = self.rng.choice(variants) if len(variants) > 1 else variants[0]
+            level = min(1.0, volume * gain)
+            channel = self._channels[free]
+            channel.set_volume(level)
+            channel.play(sound)
+            self._busy_until[free] = now + sound.get_length()
+            self._owner[free] = name
+            effect[4] = now
+            self.stats[name][1] += 1
+            if self.soundtrack is not None:
+                self.soundtrack.effect(sound, level)
+        self._pending.clear()
+
+    def report(self):
+        """Une ligne par effet ayant abandonné des déclenchements."""
+        return [f"sfx {name}: {triggers} déclenchements, {played} voix, {dropped} abandonnés"
+                for name, (triggers, played, dropped) in self.stats.items() if dropped]
+
+    def close(self):
+        for line in self.report():
+            print(line, file=sys.stderr)
+
+
+class NullMixer:
+    """Mixeur muet (simulation sans son) : rien n'est décodé ni joué."""
+
+    def load(self, name, paths, volume=1.0, voices=None, min_interval=0.0):
+        pass
+
+    def trigger(self, name, gain=1.0):
+        pass
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
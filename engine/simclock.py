@@ -0,0 +1,69 @@
+"""
+Horloge de simulation à pas fixe et générateur aléatoire partagé.
+
+Toute la logique (physique, délais, cooldowns, couleurs) lit `sim.time`
+au lieu de l'horloge murale : une même graine donne la même partie, que
+l'affichage tourne à 10 ou à 1000 fps, en direct comme en export.
+La graine se fixe avec la variable d'environnement BOUNCY_SEED.
+"""
+import os
+import random
+import sys
+import time
+
+
+def resolve_seed():
+    """Graine de BOUNCY_SEED, ou tirée au hasard (et affichée pour rejouer la partie)."""
+    seed = os.environ.get("BOUNCY_SEED")
+    if seed is not None:
+        return int(seed)
+    seed = random.SystemRandom().randrange(2**32)
+    print(f"BOUNCY_SEED={seed}", file=sys.stderr)
+    return seed
+
+
+def make_rng(seed):
+    """L'unique générateur aléatoire d'une partie : remplace le module `random` global."""
+    return random.Random(seed)
+
+
+class SimClock:
+    """
+    Horloge à pas fixe : `time` n'avance que de `1/tick_rate` à chaque `step()`.
+
+    En direct, `pending_steps()` donne le nombre de pas à jouer pour suivre
+    le temps réel ; la partie reste identique, seul l'échantillonnage des
+    frames affichées change.
+    """
+
+    def __init__(self, tick_rate, max_steps=5):
+        self.tick_rate = tick_rate
+        self.dt = 1.0 / tick_rate
+        self.ticks = 0
+        self.max_steps = max_steps
+        self._accumulator = 0.0
+        self._last = None
+
+    @property
+    def time(self):
+        """Temps de simulation écoulé, en secondes."""
+        return self.ticks * self.dt
+
+    def step(self):
+        self.ticks += 1
+
+    def pending_steps(self):
+        """Nombre de pas fixes à simuler pour rattraper le temps réel écoulé."""
+        now = time.perf_counter()
+        if self._last is None:
+            self._last = now
+            return 1
+        self._accumulator += now - self._last
+        self._last = now
+        steps = int(self._accumulator / self.dt)
+        self._accumulator -= steps * self.dt
+        if steps > self.max_steps:
+            # machine trop lente : on ralentit plutôt que de sauter des pas
+            steps = self.max_steps
+            self._accumulator = 0.0
+        return steps
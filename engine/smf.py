@@ -0,0 +1,212 @@
+"""
+Lecteur de fichiers MIDI standard (SMF format 0 et 1), sans dépendance.
+
+Ne lit que ce dont les scènes ont besoin : les notes et le programme de
+chaque instrument. Les pistes sont décodées en flux (status courant,
+méta-événements et sysex sautés) et les ticks convertis en secondes par la
+carte des tempos.
+
+Le résultat est identique à celui de pretty_midi, qu'utilisaient les
+scènes : mêmes instruments (un par programme / canal / piste, dans l'ordre
+de leur première note), mêmes appariements note-on / note-off, et tempos
+lus sur la première piste seulement.
+"""
+import struct
+
+# tick maximal au-delà duquel le fichier est considéré corrompu (même seuil que pretty_midi)
+MAX_TICK = 10000000
+
+# octets de données des messages de canal, selon le status (0x8n à 0xEn)
+_DATA_BYTES = {0x80: 2, 0x90: 2, 0xA0: 2, 0xB0: 2, 0xC0: 1, 0xD0: 1, 0xE0: 2}
+
+
+class Instrument:
+    def __init__(self, program, is_drum):
+        self.program = program
+        self.is_drum = is_drum
+        self.notes = []  # (début, fin, pitch, velocity) en secondes
+
+
+def _varlen(data, pos):
+    value = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value = (value << 7) | (byte & 0x7F)
+        if byte < 0x80:
+            return value, pos
+
+
+def chunk(data, pos):
+    """(type, contenu, position suivante) du chunk qui commence à `pos` ; un chunk coupé lève ValueError."""
+    if pos + 8 > len(data):
+        raise ValueError("chunk tronqué")
+    kind, length = struct.unpack_from(">4sI", data, pos)
+    pos += 8
+    if pos + length > len(data):
+        raise ValueError("chunk tronqué")
+    return kind, data[pos:pos + length], pos + length
+
+
+def events(track):
+    """
+    Événements d'une piste : (tick absolu, status, données).
+
+    Messages de canal : status 0x80..0xEF, données (d1, d2).
+    Méta-événements   : status 0xFF, données (type, contenu).
+    Les sysex sont sautés. Un événement coupé par la fin de la piste lève
+    IndexError (lecture) ou ValueError (longueur qui déborde).
+    """
+    pos = 0
+    tick = 0
+    running = None
+    end = len(track)
+    while pos < end:
+        delta, pos = _varlen(track, pos)
+        tick += delta
+        status = track[pos]
+        if status < 0x80:
+            if running is None:
+                raise ValueError("octet de données sans status courant")
+            status = running  # status courant : l'octet lu est déjà une donnée
+        else:
+            pos += 1
+        if status == 0xFF:
+            kind = track[pos]
+            length, pos = _varlen(track, pos + 1)
+            yield tick, status, (kind, track[pos:pos + length])
+            pos += length
+        elif status in (0xF0, 0xF7):
+            length, pos = _varlen(track, pos)
+            pos += length
+        elif status >= 0xF0:
+            pass  # message temps réel isolé : pas de données
+        else:
+            running = status
+            if _DATA_BYTES[status & 0xF0] == 2:
+                yield tick, status, (track[pos], track[pos + 1])
+                pos += 2
+            else:
+                yield tick, status, (track[pos], 0)
+                pos += 1
+    if pos != end:
+        raise ValueError("piste tronquée")
+
+
+class TempoMap:
+    """Conversion tick -> secondes, par morceaux de tempo constant (120 bpm par défaut)."""
+
+    def __init__(self, resolution, track):
+        self.resolution = resolution
+        scales = [(0, 60.0 / (120.0 * resolution))]
+        for tick, status, (kind, payload) in track:
+            if status != 0xFF or kind != 0x51:
+                continue
+            microseconds = int.from_bytes(payload[:3], "big")
+            if len(payload) < 3 or not microseconds:
+                raise ValueError("tempo tronqué ou nul")
+            bpm = 6e7 / microseconds
+            scale = 60.0 / (bpm * resolution)
+            if tick == 0:
+                scales = [(0, scale)]
+            elif scale != scales[-1][1]:  # tempo répété : ignoré
+                scales.append((tick, scale))
+        # début (tick, secondes) de chaque morceau ; même arithmétique que pretty_midi
+        self._ticks = [t for t, _ in scales]
+        self._scales = [s for _, s in scales]
+        self._times = [0.0]
+        for (t0, s), t1 in zip(scales[:-1], self._ticks[1:]):
+            self._times.append(self._times[-1] + s * (t1 - t0))
+
+    def time(self, tick):
+        k = len(self._ticks) - 1
+        while self._ticks[k] > tick:
+            k -= 1
+        return self._times[k] + self._scales[k] * (tick - self._ticks[k])
+
+
+def read(path):
+    """
+    Instruments du fichier MIDI `path`, avec leurs notes en secondes.
+    Un fichier tronqué ou corrompu lève ValueError, quel que soit l'endroit de la coupure.
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+
+    # l'en-tête puis les `ntracks` pistes qu'il annonce ; ce qui suit (octets de bourrage
+    # des fichiers trouvés en ligne, par exemple) est ignoré, comme le fait mido
+    try:
+        kind, body, pos = chunk(data, 0)
+        if kind != b"MThd":
+            raise ValueError("pas un fichier MIDI standard")
+        if len(body) < 6:
+            raise ValueError("en-tête tronqué")
+        fmt, ntracks, division = struct.unpack_from(">HHH", body)
+        tracks = []
+        for _ in range(ntracks):
+            kind, body, pos = chunk(data, pos)
+            if kind != b"MTrk":
+                raise ValueError("piste attendue")
+            try:
+                tracks.append(list(events(body)))
+            except IndexError:
+                raise ValueError("piste tronquée") from None
+    except ValueError as e:
+        raise ValueError(f"{path} : {e}") from None
+    if fmt not in (0, 1):
+        raise ValueError(f"{path} : format SMF {fmt} non géré")
+    if division & 0x8000:
+        raise ValueError(f"{path} : division SMPTE non gérée")
+    if not division:
+        raise ValueError(f"{path} : division nulle")
+    if not tracks:
+        return []
+    if max((track[-1][0] for track in tracks if track), default=0) + 1 > MAX_TICK:
+        raise ValueError(f"{path} : tick trop grand, fichier probablement corrompu")
+
+    try:
+        tempo = TempoMap(division, tracks[0])
+    except ValueError as e:
+        raise ValueError(f"{path} : {e}") from None
+    time = {}  # cache tick -> secondes
+
+    def seconds(tick):
+        t = time.get(tick)
+        if t is None:
+            t = time[tick] = tempo.time(tick)
+        return t
+
+    instruments = {}  # (programme, canal, piste) -> Instrument, dans l'ordre de création
+    for index, track in enumerate(tracks):
+        programs = [0] * 16
+        open_notes = {}  # (canal, pitch) -> [(tick de début, velocity)]
+        for tick, status, (d1, d2) in track:
+            kind = status & 0xF0
+            chan = status & 0x0F
+            if status == 0xFF:
+                continue
+            if kind == 0xC0:
+                programs[chan] = d1
+            elif kind == 0x90 and d2 > 0:
+                open_notes.setdefault((chan, d1), []).append((tick, d2))
+            elif kind == 0x80 or kind == 0x90:
+                pending = open_notes.get((chan, d1))
+                if pending is None:
+                    continue  # note-off orphelin
+                # un note-off ferme toutes les notes ouvertes avant ce tick ;
+                # une note rallumée au même tick reste ouverte
+                closing = [(t, v) for t, v in pending if t != tick]
+                keeping = [(t, v) for t, v in pending if t == tick]
+                if closing:
+                    key = (programs[chan], chan, index)
+                    inst = instruments.get(key)
+                    if inst is None:
+                        inst = instruments[key] = Instrument(programs[chan], chan == 9)
+                    end = seconds(tick)
+                    for t, v in closing:
+                        inst.notes.append((seconds(t), end, d1, v))
+                if closing and keeping:
+                    open_notes[(chan, d1)] = keeping
+                else:
+                    del open_notes[(chan, d1)]
+    return list(instruments.values())
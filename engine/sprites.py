@@ -0,0 +1,180 @@
+"""
+Cache LRU des sprites de balles et de leurs traînées.
+
+Une balle (rayon, remplissage, contour) ou un échantillon de traînée
+(rayon, couleur, alpha) n'est dessiné qu'une fois dans une petite
+surface ; chaque frame ne fait ensuite que des blits, sans allouer de
+surface. Les rayons sont quantifiés à l'entier (comme le fait
+pygame.draw), donc une balle qui grossit réutilise les mêmes entrées.
+Une balle dont la teinte change à chaque frame n'a qu'un sprite 8 bits
+par rayon, recoloré par sa palette (comme les tuiles de RingRenderer).
+
+Ce qui ne bouge plus (balles figées) se cuit une fois dans un StaticLayer,
+recomposé en un seul blit par frame.
+"""
+from collections import OrderedDict
+
+import numpy as np
+import pygame
+
+
+class SpriteCache:
+    def __init__(self, maxsize=512):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._items = OrderedDict()
+
+    def get(self, key, render, *args):
+        """Sprite associé à `key`, rendu par render(*args) au premier accès."""
+        items = self._items
+        sprite = items.get(key)
+        if sprite is not None:
+            items.move_to_end(key)
+            self.hits += 1
+            return sprite
+        self.misses += 1
+        sprite = items[key] = render(*args)
+        if len(items) > self.maxsize:
+            items.popitem(last=False)
+        return sprite
+
+    def draw_disc(self, surf, x, y, radius, color, alpha=255):
+        """Disque translucide centré en (x, y) : un échantillon de traînée."""
+        r = int(radius)
+        sprite = self.get(("disc", r, color, alpha), _render_disc, r, color, alpha)
+        surf.blit(sprite, (x - r, y - r))
+
+    def draw_ball(self, surf, x, y, radius, fill, border=None, border_width=0, inset=False):
+        """
+        Balle pleine, avec un contour optionnel de `border_width` pixels :
+        tracé par-dessus le disque plein, ou, avec `inset`, tracé d'abord et
+        rempli ensuite par un disque de rayon radius - border_width.
+        """
+        r = int(radius)
+        sprite = self.get(("ball", r, fill, border, border_width, inset),
+                          _render_ball, r, fill, border, border_width, inset)
+        c = r + 1
+        surf.blit(sprite, (int(x) - c, int(y) - c))
+
+    def draw_tinted_ball(self, surf, x, y, radius, fill):
+        """
+        draw_ball sans contour, pour une couleur qui change à chaque frame :
+        un seul sprite palettisé par rayon, dont on change l'entrée de remplissage.
+        """
+        r = int(radius)
+        sprite = self.get(("tinted", r), _render_mask, r)
+        sprite.set_palette_at(1, fill)
+        c = r + 1
+        surf.blit(sprite, (int(x) - c, int(y) - c))
+
+    def draw_balls(self, surf, xs, ys, radii, table, hues):
+        """
+        draw_ball sans contour pour des tableaux de balles, de couleurs
+        table(hue) (colors.HueTable), en un seul appel Surface.blits.
+        """
+        batch = self._batch(xs, ys, radii.astype(np.int64), table, hues,
+                            "ball", _render_ball, None, 0, False)
+        surf.blits(batch, doreturn=False)
+
+    def ghosts(self, xs, ys, radii, table, hues, alpha, width=1):
+        """
+        Fantômes de tableaux de balles (disque noir et contour table(hue) de
+        `width` pixels, d'opacité `alpha`) : séquence (sprite, position) pour
+        FadingTrail.blits. Chaque sprite remplace les pixels qu'il couvre,
+        comme les deux pygame.draw.circle qu'il évite.
+        """
+        radii = np.maximum(radii.astype(np.int64), 1)
+        return self._batch(xs, ys, radii, table, hues, "ghost", _render_ghost, alpha, width)
+
+    def _batch(self, xs, ys, radii, table, hues, kind, render, *args):
+        """
+        Séquence (sprite, position) de balles de rayons entiers `radii` : le
+        sprite (kind, rayon, couleur, *args) de chaque couple (rayon, teinte)
+        n'est demandé au cache qu'une fois, puis la séquence est construite
+        en C par zip/map, comme ParticleSystem.draw.
+        """
+        colors = table.colors
+        codes = radii * len(colors) + table.indices(hues)
+        sprites = {}
+        for code in np.unique(codes).tolist():
+            r, i = divmod(code, len(colors))
+            sprites[code] = self.get((kind, r, colors[i], *args), render, r, colors[i], *args)
+        c = radii + 1
+        px = xs.astype(np.int64) - c
+        py = ys.astype(np.int64) - c
+        return zip(map(sprites.__getitem__, codes.tolist()), zip(px.tolist(), py.tolist()))
+
+
+class StaticLayer:
+    """
+    Calque des éléments immobiles, composé une fois par frame.
+
+    S'utilise comme une surface de destination : `blit` y accumule les
+    sprites en alpha prémultiplié (opérateur « over »), si bien que le
+    calque recomposé sur l'écran donne le même résultat que les blits
+    d'origine, dans le même ordre.
+    """
+
+    def __init__(self, size):
+        self.surface = pygame.Surface(size, pygame.SRCALPHA)
+        self.surface.fill((0, 0, 0, 0))
+        self._rect = None  # zone non vide du calque
+
+    def blit(self, source, dest):
+        rect = self.surface.blit(source.premul_alpha(), dest,
+                                 special_flags=pygame.BLEND_PREMULTIPLIED)
+        self._rect = rect if self._rect is None else self._rect.union(rect)
+        return rect
+
+    def draw(self, surf):
+        if self._rect:
+            surf.blit(self.surface, self._rect.topleft, self._rect,
+                      special_flags=pygame.BLEND_PREMULTIPLIED)
+
+
+def _render_disc(r, color, alpha):
+    s = pygame.Surface((r * 2, r * 2), pygame.SRCALPHA)
+    pygame.draw.circle(s, (*color, alpha), (r, r), r)
+    return s
+
+
+# couleur clé autour du disque des fantômes (jamais produite par les tables de teintes)
+_GHOST_KEY = (1, 2, 3, 0)
+
+
+def _render_ghost(r, outline, alpha, width):
+    c = r + 1
+    s = pygame.Surface((2 * c, 2 * c), pygame.SRCALPHA)
+    s.fill(_GHOST_KEY)
+    pygame.draw.circle(s, (0, 0, 0, alpha), (c, c), r)
+    pygame.draw.circle(s, (*outline, alpha), (c, c), r, width)
+    # copie sans mélange, comme pygame.draw, sauf la couleur clé
+    s.set_colorkey(_GHOST_KEY)
+    s.set_alpha(None)
+    return s
+
+
+def _render_mask(r):
+    # indice 0 transparent (clé), indice 1 = remplissage, teinté au moment du blit
+    c = r + 1
+    s = pygame.Surface((2 * c, 2 * c), depth=8)
+    s.fill(0)
+    pygame.draw.circle(s, 1, (c, c), r)
+    s.set_colorkey(0)
+    return s
+
+
+def _render_ball(r, fill, border, border_width, inset):
+    # marge d'un pixel : le sprite couvre exactement ce que pygame.draw.circle toucherait
+    c = r + 1
+    s = pygame.Surface((2 * c, 2 * c), pygame.SRCALPHA)
+    if border is not None and inset:
+        # même ordre que les tracés directs : les pixels laissés vides entre les deux restent transparents
+        pygame.draw.circle(s, border, (c, c), r, border_width)
+        pygame.draw.circle(s, fill, (c, c), r - border_width)
+        return s
+    pygame.draw.circle(s, fill, (c, c), r)
+    if border is not None:
+        pygame.draw.circle(s, border, (c, c), r, border_width)
+    return s
@@ -0,0 +1,278 @@
+"""
+Essaim de balles vectorisé (NumPy) : des milliers de balles dans un anneau.
+
+Même physique que physics.Body et physics.Ring, mais pour toutes les
+balles d'un coup : chaque balle est une ligne d'un tableau
+« struct-of-arrays » (position, position au pas précédent, vitesse, rayon,
+teinte, time_scale, sortie). La gravité, le contact avec l'anneau (test de
+l'ouverture qui tourne compris), la détection des sorties et le retrait des
+balles hors écran sont quelques opérations sur tableaux, quel que soit le
+nombre de balles.
+
+Les chocs entre balles passent par une grille triée : les paires voisines
+sont trouvées par dichotomie (searchsorted), puis les paires en contact
+sont résolues par lots de paires disjointes. Chaque choc sépare les deux
+balles et échange leurs vitesses normales, même si elles s'éloignent déjà
+(la réponse d'origine de la scène de rotation ; physics.collide, lui,
+n'échange que si elles se rapprochent). Dans un tas, l'ordre des chocs
+diffère de la boucle paire par paire, pas leur nature.
+
+Comme le noyau scalaire, l'essaim ne joue aucun effet : il renvoie les
+indices des balles qui ont rebondi ou qui sont sorties.
+"""
+import numpy as np
+
+from .physics import MAX_BOUNCES, screen_angles, times_of_impact
+
+# colonnes du tableau de balles
+X, Y, PREV_X, PREV_Y, VX, VY, RADIUS, HUE, TIME_SCALE, EXITED = range(10)
+FIELDS = 10
+
+# cellule courante + la moitié des voisines : chaque paire de cellules n'est vue qu'une fois
+_FORWARD = ((0, 0), (1, 0), (-1, 1), (0, 1), (1, 1))
+# clé de cellule : cx * _STRIDE + cy
+_STRIDE = 1 << 32
+_NO_PAIR = np.uint64(2 ** 64 - 1)
+
+
+def _mix(keys):
+    """Hachage splitmix64 d'entiers : priorités sans lien avec la position des balles."""
+    z = keys.astype(np.uint64)
+    z ^= z >> np.uint64(30)
+    z *= np.uint64(0xBF58476D1CE4E5B9)
+    z ^= z >> np.uint64(27)
+    z *= np.uint64(0x94D049BB133111EB)
+    z ^= z >> np.uint64(31)
+    return z
+
+
+class Swarm:
+    def __init__(self, capacity=256):
+        self.count = 0
+        self._data = np.zeros((capacity, FIELDS))
+        # tampon réutilisé par le compactage
+        self._spare = np.zeros_like(self._data)
+
+    def __len__(self):
+        return self.count
+
+    @property
+    def data(self):
+        """Vue (count, FIELDS) des balles, dans l'ordre d'ajout."""
+        return self._data[:self.count]
+
+    def add(self, n, x, y, vx, vy, radius, time_scale, hue=0.0):
+        """Ajoute n balles à l'intérieur. x, y, vx, vy : scalaires ou tableaux de n valeurs."""
+        needed = self.count + n
+        capacity = len(self._data)
+        if needed > capacity:
+            while capacity < needed:
+                capacity *= 2
+            data = np.zeros((capacity, FIELDS))
+            data[:self.count] = self._data[:self.count]
+            self._data = data
+            self._spare = np.zeros_like(data)
+        rows = self._data[self.count:needed]
+        self.count = needed
+        rows[:, X] = rows[:, PREV_X] = x
+        rows[:, Y] = rows[:, PREV_Y] = y
+        rows[:, VX] = vx
+        rows[:, VY] = vy
+        rows[:, RADIUS] = radius
+        rows[:, HUE] = hue
+        rows[:, TIME_SCALE] = time_scale
+        rows[:, EXITED] = 0
+
+    def integrate(self, gravity):
+        """Un pas de Body.integrate pour toutes les balles ; garde la position de départ."""
+        d = self.data
+        d[:, PREV_X] = d[:, X]
+        d[:, PREV_Y] = d[:, Y]
+        d[:, VY] += gravity
+        d[:, X] += d[:, VX] * d[:, TIME_SCALE]
+        d[:, Y] += d[:, VY] * d[:, TIME_SCALE]
+
+    def contain(self, ring, max_bounces=MAX_BOUNCES):
+        """
+        Ring.sweep pour toutes les balles encore dedans : contact continu
+        avec le bord intérieur de l'anneau sur le pas qui les a amenées de
+        leur position précédente à l'actuelle.
+
+        Une balle partie au-delà du bord hors de l'ouverture (poussée par un
+        choc) est d'abord ramenée sur le bord. Une balle qui atteint le bord
+        dans l'ouverture est marquée sortie et finit son pas ; sinon elle
+        rebondit et repart du point de contact, éventuellement plusieurs
+        fois. Renvoie (sorties, rebonds) : indices des
+        balles sorties, et les rebonds en tableaux (indice de la balle, x, y
+        du contact, nx, ny, vx, vy d'avant la réflexion).
+        """
+        d = self.data
+        live = np.flatnonzero(d[:, EXITED] == 0)
+        reach = ring.radius - d[live, RADIUS]
+        px = d[live, PREV_X] - ring.x
+        py = d[live, PREV_Y] - ring.y
+        dx = d[live, X] - d[live, PREV_X]
+        dy = d[live, Y] - d[live, PREV_Y]
+        elapsed = np.zeros(len(live))
+        # balles parties au-delà du bord, hors de l'ouverture : recalées sur le bord
+        start = np.hypot(px, py)
+        moved = (start > reach) & ~ring.in_gap_many(screen_angles(px, py), 0.0)
+        scale = reach[moved] / start[moved]
+        px[moved] *= scale
+        py[moved] *= scale
+
+        exits, hits = [], []
+        active = np.arange(len(live))
+        for bounce in range(max_bounces):
+            t = times_of_impact(px[active], py[active], dx[active], dy[active], reach[active])
+            touching = t <= 1
+            active, t = active[touching], t[touching]
+            if not len(active):
+                break
+            now = elapsed[active] + (1 - elapsed[active]) * t
+            hx = px[active] + dx[active] * t
+            hy = py[active] + dy[active] * t
+            in_gap = ring.in_gap_many(screen_angles(hx, hy), now)
+            exits.append(live[active[in_gap]])
+
+            solid = ~in_gap
+            k, t, hx, hy = active[solid], t[solid], hx[solid], hy[solid]
+            dist = np.hypot(hx, hy)
+            nx, ny = hx / dist, hy / dist
+            rows = live[k]
+            vx, vy = d[rows, VX], d[rows, VY]
+            v_dot_n = vx * nx + vy * ny
+            d[rows, VX] = vx - 2 * v_dot_n * nx
+            d[rows, VY] = vy - 2 * v_dot_n * ny
+            px[k] = nx * reach[k]
+            py[k] = ny * reach[k]
+            hits.append((rows, ring.x + px[k], ring.y + py[k], nx, ny, vx, vy))
+            # reste du déplacement, réfléchi lui aussi ; au dernier rebond permis, la balle s'arrête là
+            rest = 0.0 if bounce == max_bounces - 1 else 1 - t
+            d_dot_n = dx[k] * nx + dy[k] * ny
+            dx[k] = (dx[k] - 2 * d_dot_n * nx) * rest
+            dy[k] = (dy[k] - 2 * d_dot_n * ny) * rest
+            elapsed[k] = now[solid]
+            moved[k] = True
+            active = k
+
+        # seules les balles recalées ou qui ont rebondi changent de position
+        rows = live[moved]
+        d[rows, X] = ring.x + px[moved] + dx[moved]
+        d[rows, Y] = ring.y + py[moved] + dy[moved]
+        exits = np.sort(np.concatenate(exits)) if exits else np.zeros(0, dtype=np.int64)
+        d[exits, EXITED] = 1
+        if hits:
+            hits = tuple(np.concatenate(column) for column in zip(*hits))
+        else:
+            hits = (np.zeros(0, dtype=np.int64),) + tuple(np.zeros(0) for _ in range(6))
+        return exits, hits
+
+    def pairs(self):
+        """Paires candidates (i, j) de balles encore dedans, voisines dans la grille."""
+        d = self.data
+        inside = np.flatnonzero(d[:, EXITED] == 0)
+        if len(inside) < 2:
+            empty = np.zeros(0, dtype=np.int64)
+            return empty, empty
+        cell = max(2 * d[inside, RADIUS].max(), 1.0)
+        cx = np.floor_divide(d[inside, X], cell).astype(np.int64)
+        cy = np.floor_divide(d[inside, Y], cell).astype(np.int64)
+        keys = cx * _STRIDE + cy
+        order = np.argsort(keys, kind="stable")
+        sorted_keys = keys[order]
+
+        first, second = [], []
+        for dx, dy in _FORWARD:
+            target = keys + (dx * _STRIDE + dy)
+            lo = np.searchsorted(sorted_keys, target, side="left")
+            counts = np.searchsorted(sorted_keys, target, side="right") - lo
+            total = int(counts.sum())
+            if not total:
+                continue
+            # pour chaque balle, toutes les balles de la cellule visée
+            a = np.repeat(np.arange(len(keys)), counts)
+            starts = np.repeat(lo - (np.cumsum(counts) - counts), counts)
+            b = order[starts + np.arange(total)]
+            if dx == 0 and dy == 0:
+                keep = a < b
+                a, b = a[keep], b[keep]
+            first.append(a)
+            second.append(b)
+        if not first:
+            empty = np.zeros(0, dtype=np.int64)
+            return empty, empty
+        a, b = np.concatenate(first), np.concatenate(second)
+        return inside[np.minimum(a, b)], inside[np.maximum(a, b)]
+
+    def collide(self):
+        """
+        Chocs de toutes les paires en contact, en lots vectorisés.
+
+        Les paires en contact au début du pas sont traitées par lots de
+        paires disjointes : à chaque tour, une paire passe si sa priorité
+        (un hachage de ses deux indices, pseudo-aléatoire mais fixe) est la plus petite parmi les
+        paires restantes de ses deux balles. Comme dans la boucle paire par
+        paire, chaque choc voit les positions déjà corrigées par les
+        précédents, ce qui garde les tas de balles stables ; le nombre de
+        tours reste de l'ordre du nombre de voisines d'une balle.
+        Renvoie le nombre de chocs.
+        """
+        i, j = self.pairs()
+        d = self.data
+        dist = np.hypot(d[j, X] - d[i, X], d[j, Y] - d[i, Y])
+        touching = dist < d[i, RADIUS] + d[j, RADIUS]
+        i, j = i[touching], j[touching]
+        priority = _mix(i * _STRIDE + j)
+
+        hits = 0
+        best = np.empty(self.count, dtype=np.uint64)
+        while len(i):
+            best[i] = best[j] = _NO_PAIR
+            np.minimum.at(best, i, priority)
+            np.minimum.at(best, j, priority)
+            ready = (best[i] == priority) & (best[j] == priority)
+            hits += self._resolve(i[ready], j[ready])
+            rest = ~ready
+            i, j, priority = i[rest], j[rest], priority[rest]
+        return hits
+
+    def _resolve(self, i, j):
+        """Chocs de paires disjointes (aucune balle dans deux paires) ; renvoie le nombre de chocs."""
+        d = self.data
+        dx = d[j, X] - d[i, X]
+        dy = d[j, Y] - d[i, Y]
+        dist = np.hypot(dx, dy)
+        min_dist = d[i, RADIUS] + d[j, RADIUS]
+        hit = (dist < min_dist) & (dist != 0)
+        i, j, dx, dy, dist, min_dist = i[hit], j[hit], dx[hit], dy[hit], dist[hit], min_dist[hit]
+
+        overlap = (min_dist - dist) / 2
+        nx = dx / dist
+        ny = dy / dist
+        d[i, X] -= nx * overlap
+        d[i, Y] -= ny * overlap
+        d[j, X] += nx * overlap
+        d[j, Y] += ny * overlap
+
+        # échange des composantes normales (masses égales), que les balles se rapprochent ou non
+        v_dot_n = (d[j, VX] - d[i, VX]) * nx + (d[j, VY] - d[i, VY]) * ny
+        d[i, VX] += v_dot_n * nx
+        d[i, VY] += v_dot_n * ny
+        d[j, VX] -= v_dot_n * nx
+        d[j, VY] -= v_dot_n * ny
+        return len(i)
+
+    def cull(self, width, height):
+        """Retire les balles entièrement hors de l'écran (width x height)."""
+        n = self.count
+        if not n:
+            return
+        d = self._data[:n]
+        x, y, r = d[:, X], d[:, Y], d[:, RADIUS]
+        visible = (x + r >= 0) & (x - r <= width) & (y + r >= 0) & (y - r <= height)
+        k = int(np.count_nonzero(visible))
+        if k < n:
+            np.compress(visible, d, axis=0, out=self._spare[:k])
+            self._data, self._spare = self._spare, self._data
+            self.count = k
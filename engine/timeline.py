@@ -0,0 +1,140 @@
+"""
+Timeline d'accords précompilée, avec cache sur disque.
+
+Un fichier MIDI est compilé une fois en tableaux compacts : les notes,
+triées par (début, hauteur), en colonnes pitch / velocity / channel, et
+un index `offsets` tel que l'accord i soit la tranche
+offsets[i]:offsets[i + 1], avec la durée de chaque note. Le canal est l'indice de l'instrument, comme
+dans les scènes ; `programs[canal]` donne son programme General MIDI et
+`drums[canal]` indique une piste de batterie.
+
+Le résultat est mis en cache dans `.cache/` à côté du fichier MIDI
+(music/.cache/<nom>-<empreinte>.npz) et invalidé par l'empreinte SHA-1 du
+contenu : au démarrage, pas de parsing MIDI, et à chaque rebond l'accord
+suivant est une simple tranche.
+"""
+import hashlib
+import os
+import tempfile
+
+import numpy as np
+
+from . import smf
+
+# à incrémenter quand le format des tableaux change
+CACHE_VERSION = 3
+
+# deux notes dont les débuts (arrondis à la ms) diffèrent de moins d'EPS forment un accord
+EPS = 1e-3
+
+
+def file_hash(path):
+    with open(path, "rb") as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+def cache_path(path, digest):
+    folder, name = os.path.split(path)
+    stem = os.path.splitext(name)[0]
+    return os.path.join(folder, ".cache", f"{stem}-{digest[:16]}.npz")
+
+
+def compile_midi(path):
+    """Parse le MIDI (engine.smf) et regroupe les notes en accords, comme le faisaient les scènes."""
+    instruments = smf.read(path)
+    notes = []
+    for chan, inst in enumerate(instruments):
+        for start, end, pitch, velocity in inst.notes:
+            notes.append((round(start, 3), pitch, velocity, chan, end - start))
+    notes.sort(key=lambda n: (n[0], n[1]))
+
+    # regroupement séquentiel : même critère que la boucle `while abs(t - t0) < EPS` d'origine
+    offsets = [0]
+    starts = []
+    i = 0
+    while i < len(notes):
+        t0 = notes[i][0]
+        starts.append(t0)
+        while i < len(notes) and abs(notes[i][0] - t0) < EPS:
+            i += 1
+        offsets.append(i)
+
+    columns = np.array([n[1:4] for n in notes], dtype=np.uint8).reshape(-1, 3)
+    return {
+        "version": np.array(CACHE_VERSION),
+        "offsets": np.array(offsets, dtype=np.int32),
+        "starts": np.array(starts, dtype=np.float64),
+        "pitch": columns[:, 0],
+        "velocity": columns[:, 1],
+        "channel": columns[:, 2],
+        "duration": np.array([n[4] for n in notes], dtype=np.float32),
+        "programs": np.array([inst.program for inst in instruments], dtype=np.uint8),
+        "drums": np.array([inst.is_drum for inst in instruments], dtype=bool),
+    }
+
+
+class ChordTimeline:
+    def __init__(self, arrays):
+        self.offsets = arrays["offsets"]
+        self.starts = arrays["starts"]
+        self.pitch = arrays["pitch"]
+        self.velocity = arrays["velocity"]
+        self.channel = arrays["channel"]
+        self.duration = arrays["duration"]
+        self.programs = arrays["programs"]
+        self.drums = arrays["drums"]
+        # copies Python des colonnes : une tranche de liste ne crée pas de scalaires NumPy
+        self._offsets = self.offsets.tolist()
+        self._notes = list(zip(self.pitch.tolist(), self.velocity.tolist(), self.channel.tolist()))
+        self._durations = self.duration.tolist()
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    @property
+    def note_count(self):
+        return len(self._notes)
+
+    def chord(self, i):
+        """Notes (pitch, velocity, canal) de l'accord i."""
+        return self._notes[self._offsets[i]:self._offsets[i + 1]]
+
+    def durations(self, i):
+        """Durées (s) des notes de l'accord i, dans le même ordre."""
+        return self._durations[self._offsets[i]:self._offsets[i + 1]]
+
+    def set_instruments(self, midi_out):
+        """Envoie le program change de chaque instrument sur son canal."""
+        for chan, program in enumerate(self.programs.tolist()):
+            midi_out.set_instrument(program, chan)
+
+
+def load(path):
+    """Timeline du fichier MIDI `path`, depuis le cache si son contenu n'a pas changé."""
+    digest = file_hash(path)
+    cached = cache_path(path, digest)
+    try:
+        with np.load(cached) as data:
+            if int(data["version"]) == CACHE_VERSION:
+                return ChordTimeline({k: data[k] for k in data.files})
+    except (OSError, KeyError, ValueError):
+        pass
+
+    arrays = compile_midi(path)
+    folder = os.path.dirname(cached)
+    os.makedirs(folder, exist_ok=True)
+    # on remplace les anciennes versions compilées de ce fichier ; un rendu lancé
+    # en même temps peut les avoir déjà retirées
+    base = os.path.basename(cached)
+    prefix = base.rsplit("-", 1)[0] + "-"
+    for name in os.listdir(folder):
+        if name.startswith(prefix) and len(name) == len(prefix) + 20 and name.endswith(".npz") and name != base:
+            try:
+                os.remove(os.path.join(folder, name))
+            except FileNotFoundError:
+                pass
+    # fichier temporaire propre au processus, renommé d'un coup : les rendus simultanés ne se marchent pas dessus
+    with tempfile.NamedTemporaryFile(dir=folder, prefix=base + ".", suffix=".tmp", delete=False) as f:
+        np.savez(f, **arrays)
+    os.replace(f.name, cached)
+    return ChordTimeline(arrays)
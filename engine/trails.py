@@ -0,0 +1,107 @@
+"""
+Calque de traînée à décroissance exponentielle, à coût fixe par frame.
+
+Les fantômes sont dessinés dans une surface SRCALPHA dont l'alpha est
+multiplié par `persistence` à chaque frame (arithmétique entière sur une
+vue NumPy du canal alpha, sans allocation). Seule la zone touchée pendant
+la durée de vie d'un fantôme est estompée puis blittée, et le calque peut
+tourner en résolution réduite (`scale`) : une session d'une heure coûte le
+même temps par frame que la première minute.
+"""
+import sys
+from collections import deque
+
+import numpy as np
+import pygame
+
+
+class FadingTrail:
+    def __init__(self, size, persistence, scale=1.0):
+        self.size = size
+        self.scale = scale
+        w, h = max(1, int(size[0] * scale)), max(1, int(size[1] * scale))
+        self.surface = pygame.Surface((w, h), pygame.SRCALPHA)
+        self._bounds = self.surface.get_rect()
+
+        # position de l'octet alpha dans chaque pixel 32 bits
+        shift = self.surface.get_shifts()[3]
+        byte = shift // 8
+        self._alpha_byte = byte if sys.byteorder == "little" else 3 - byte
+        self._scratch = np.empty((h, w), dtype=np.uint16)
+
+        # zones dessinées pendant les dernières frames (tant qu'elles restent visibles)
+        self._dirty = deque()
+        self._frame_rect = None
+        self.set_persistence(persistence)
+
+    def set_persistence(self, persistence):
+        """
+        Fraction d'alpha conservée d'une frame à la suivante (0 = pas de traînée).
+        Le facteur est plafonné à 255/256 : arrondi à 256 (dès ~0.998), la traînée ne s'effacerait jamais.
+        """
+        self.persistence = persistence
+        self._factor = min(int(round(persistence * 256)), 255)
+        # nombre de frames pour qu'un alpha de 255 tombe à zéro
+        alpha, frames = 255, 0
+        while alpha and frames < 10000:
+            alpha = (alpha * self._factor) >> 8
+            frames += 1
+        self._lifetime = frames
+        self._dirty = deque(self._dirty, maxlen=frames)
+
+    def clear(self):
+        self.surface.fill((0, 0, 0, 0))
+        self._dirty.clear()
+        self._frame_rect = None
+
+    def circle(self, color, center, radius, width=0):
+        """pygame.draw.circle en coordonnées écran, sur le calque de traînée."""
+        s = self.scale
+        if width:
+            width = max(1, int(width * s))
+        rect = pygame.draw.circle(self.surface, color,
+                                  (int(center[0] * s), int(center[1] * s)),
+                                  max(1, radius * s), width)
+        self._frame_rect = rect if self._frame_rect is None else self._frame_rect.union(rect)
+
+    def blits(self, batch):
+        """Surface.blits sur le calque ; les positions sont en pixels du calque (écran * scale)."""
+        rects = self.surface.blits(batch)
+        if rects:
+            rect = rects[0].unionall(rects[1:])
+            self._frame_rect = rect if self._frame_rect is None else self._frame_rect.union(rect)
+
+    def _live_rect(self):
+        """Zone du calque qui contient encore des pixels visibles."""
+        rects = [r for r in self._dirty if r is not None]
+        if not rects:
+            return None
+        return rects[0].unionall(rects[1:]).clip(self._bounds)
+
+    def fade(self):
+        """Applique une frame de décroissance, puis ouvre la frame suivante."""
+        self._dirty.append(self._frame_rect)
+        self._frame_rect = None
+        rect = self._live_rect()
+        if not rect:
+            return  # calque entièrement transparent : rien à faire
+        w, h = self.surface.get_size()
+        raw = np.asarray(self.surface.get_view("1")).view(np.uint8).reshape(h, w * 4)
+        alpha = raw[rect.top:rect.bottom, rect.left * 4 + self._alpha_byte:rect.right * 4:4]
+        scratch = self._scratch[:rect.height, :rect.width]
+        np.multiply(alpha, self._factor, out=scratch, dtype=np.uint16)
+        np.right_shift(scratch, 8, out=scratch)
+        alpha[...] = scratch
+        del alpha, raw  # libère le verrou de la surface
+
+    def draw(self, surf):
+        rect = self._live_rect()
+        if not rect:
+            return
+        if self.scale == 1.0:
+            surf.blit(self.surface, rect.topleft, rect)
+            return
+        s = self.scale
+        dest = pygame.Rect(int(rect.x / s), int(rect.y / s), int(rect.w / s), int(rect.h / s))
+        layer = pygame.transform.smoothscale(self.surface.subsurface(rect), dest.size)
+        surf.blit(layer, dest.topleft)
@@ -0,0 +1,276 @@
+"""
+Réglage automatique d'une scène sur la longueur de son morceau.
+
+Chaque rebond joue l'accord suivant : pour que le morceau tombe juste sur
+la durée du clip, il faut autant de rebonds que d'accords. Le tuner joue
+la scène elle-même sans tête (scene.HeadlessEngine : ni fenêtre, ni son,
+ni MIDI), en comptant les accords qu'elle aurait joués, et cherche par
+dichotomie les constantes qui donnent le bon nombre de rebonds :
+
+ - circle_music_speed_(rainbow).py : TIME_ACCEL_FACTOR, puis MAX_TIME_SCALE,
+   puis SIZE_UP_FACTOR ; la balle ne doit pas dépasser FILL_LIMIT du rayon
+   du cercle à la fin du clip ;
+ - circles_race_(rainbow).py / (color).py : START_VX, START_VY (même
+   direction, vitesse mise à l'échelle) ; la durée du clip est GAME_DURATION.
+
+Les parties sont jouées avec la graine du clip à rendre (--seed, par défaut
+BOUNCY_SEED, sinon SEED) : la direction de départ des courses varie avec la
+graine (START_JITTER). Avec plusieurs --seed, le nombre de rebonds visé est
+la moyenne des parties, et l'écart de chaque graine est affiché.
+
+Les constantes réglées sont celles du module de la scène ; avec --write,
+les valeurs trouvées sont réécrites dans le script. Si le meilleur réglage
+manque l'objectif de plus de --tolerance rebonds, l'écart est signalé, rien
+n'est écrit et la commande sort en erreur.
+
+    python -m engine.tuner "circle_music_speed_(rainbow).py" --seconds 45
+    python -m engine.tuner "circles_race_(color).py" --music music/Tetris2.mid --write
+    python -m engine.tuner "circles_race_(rainbow).py" --seed 1234 --write
+"""
+import argparse
+import ast
+import math
+import os
+import sys
+import time
+
+from . import scene, timeline
+
+# graine des parties jouées pour le réglage, sans --seed ni BOUNCY_SEED
+SEED = 0
+
+# taille maximale de la balle (part du rayon du cercle) à la fin du clip
+FILL_LIMIT = 0.8
+
+# itérations de dichotomie par constante, puis voisins testés autour du meilleur réglage
+BISECT_STEPS = 20
+LOCAL_SCAN = 8
+
+
+def write_constants(path, values):
+    """Réécrit dans le script les affectations de module des constantes `values`."""
+    with open(path, encoding="utf-8") as f:
+        source = f.read()
+    lines = source.splitlines(keepends=True)
+    for node in ast.parse(source, path).body:
+        if not isinstance(node, ast.Assign) or node.lineno != node.end_lineno or len(node.targets) != 1:
+            continue
+        target = node.targets[0]
+        names = [t.id for t in target.elts] if isinstance(target, ast.Tuple) else [getattr(target, "id", None)]
+        if not all(name in values for name in names):
+            continue
+        line = lines[node.lineno - 1]
+        head = line[:node.value.col_offset]
+        tail = line[node.value.end_col_offset:]
+        lines[node.lineno - 1] = head + ", ".join(repr(values[name]) for name in names) + tail
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("".join(lines))
+
+
+def _rounded(name, digits):
+    return lambda k: {name: round(k, digits)}
+
+
+class ChordCounter:
+    """Morceau muet et sans fin : compte les accords que la scène aurait joués."""
+
+    def __init__(self):
+        self.index = 0
+
+    def play_next(self):
+        self.index += 1
+        return True
+
+
+class Model:
+    """Une scène jouée sans tête, avec les constantes de module `values`, pour chaque graine de `seeds`."""
+
+    def __init__(self, scene_cls, seeds=(SEED,)):
+        self.scene_cls = scene_cls
+        self.module = sys.modules[scene_cls.__module__]
+        self.seeds = list(seeds)
+
+    def default_seconds(self):
+        return 30.0
+
+    def configure(self, values):
+        """Classe de scène à jouer pour `values` ; par défaut, les constantes du module sont remplacées."""
+        for name, value in values.items():
+            setattr(self.module, name, value)
+        return self.scene_cls
+
+    def build(self, values, seed):
+        """Partie neuve (moteur sans tête, compteur d'accords) jouée avec `values`."""
+        scene_cls = self.configure(values)
+        engine = scene.HeadlessEngine(scene_cls, seed)
+        engine.music = ChordCounter()
+        return engine, scene_cls(engine)
+
+    def counts(self, values, steps, limit):
+        """Accords joués en `steps` pas, par graine (on s'arrête au-delà de `limit`)."""
+        result = []
+        for seed in self.seeds:
+            engine, game = self.build(values, seed)
+            sim, music = engine.sim, engine.music
+            for _ in range(steps):
+                game.step()
+                sim.step()
+                if music.index > limit:
+                    break
+            result.append(music.index)
+        return result
+
+    def count(self, values, steps, limit):
+        """Accords joués en moyenne sur les graines (arrondi)."""
+        counts = self.counts(values, steps, limit)
+        return round(sum(counts) / len(counts))
+
+
+class SpeedModel(Model):
+    """circle_music_speed_(rainbow).py : une balle qui accélère et grossit à chaque rebond."""
+
+    def start(self, target):
+        values = {name: getattr(self.module, name)
+                  for name in ("TIME_ACCEL_FACTOR", "MAX_TIME_SCALE", "SIZE_UP_FACTOR")}
+        # la balle ne doit pas dépasser FILL_LIMIT du cercle après `target` rebonds
+        _, game = self.build(values, self.seeds[0])
+        size_max = math.floor((FILL_LIMIT * game.outer.radius - game.ball.radius) / max(target, 1) * 100) / 100
+        values["SIZE_UP_FACTOR"] = min(values["SIZE_UP_FACTOR"], size_max)
+        knobs = [
+            (1.0, 1.1, _rounded("TIME_ACCEL_FACTOR", 4), 1e-4),
+            (self.module.TIME_SCALE, 5.0, _rounded("MAX_TIME_SCALE", 2), 1e-2),
+            (0.0, size_max, _rounded("SIZE_UP_FACTOR", 2), 1e-2),
+        ]
+        return values, knobs
+
+
+class RaceModel(Model):
+    """
+    circles_race_(rainbow / color).py : deux balles qui cassent des arcs tournants.
+    Course telle que rendue : la direction de départ varie avec la graine (START_JITTER).
+    """
+
+    def default_seconds(self):
+        return float(self.scene_cls.duration)
+
+    def start(self, target):
+        vx, vy = self.scene_cls.start_velocity
+        values = {"START_VX": vx, "START_VY": vy}
+
+        def scaled(k):
+            return {"START_VX": round(vx * k, 1), "START_VY": round(vy * k, 1)}
+
+        # pas de 0.1 sur la plus grande composante
+        return values, [(0.25, 4.0, scaled, 0.1 / max(abs(vx), abs(vy)))]
+
+    def configure(self, values):
+        # la vitesse de départ est un attribut de la classe, lu à sa création dans le script
+        return type(self.scene_cls.__name__, (self.scene_cls,), {
+            "start_velocity": (values["START_VX"], values["START_VY"]),
+        })
+
+
+MODELS = {
+    "circle_music_speed_(rainbow).py": SpeedModel,
+    "circles_race_(rainbow).py": RaceModel,
+    "circles_race_(color).py": RaceModel,
+}
+
+
+def fit(model, target, steps):
+    """
+    Constantes dont le nombre de rebonds sur `steps` pas est le plus proche de `target`.
+
+    Chaque réglage (min, max, valeurs(k), pas) est ajusté à son tour, en
+    partant du meilleur réglage précédent, jusqu'à tomber juste. Renvoie
+    (constantes, rebonds, simulations) : si l'objectif est hors d'atteinte,
+    les rebonds diffèrent de `target`, à l'appelant de le signaler.
+    """
+    values, knobs = model.start(target)
+    limit = 2 * target + 10
+    seen = {}
+
+    def count(v):
+        key = tuple(sorted(v.items()))
+        if key not in seen:
+            seen[key] = model.count(v, steps, limit)
+        return seen[key]
+
+    best = values
+    for lo, hi, apply, unit in knobs:
+        if count(best) == target:
+            break
+        base = best
+        candidates = []
+        # dichotomie : le nombre de rebonds croît avec chaque constante réglée
+        for _ in range(BISECT_STEPS):
+            mid = (lo + hi) / 2
+            v = {**base, **apply(mid)}
+            n = count(v)
+            candidates.append((abs(n - target), mid, v))
+            if n == target:
+                break
+            if n < target:
+                lo = mid
+            else:
+                hi = mid
+        # physique chaotique : on teste aussi quelques voisins du meilleur réglage
+        _, k, _ = min(candidates, key=lambda cand: cand[0])
+        for i in range(-LOCAL_SCAN, LOCAL_SCAN + 1):
+            v = {**base, **apply(k + i * unit)}
+            candidates.append((abs(count(v) - target), k + i * unit, v))
+        candidate = min(candidates, key=lambda cand: cand[0])[2]
+        if abs(count(candidate) - target) < abs(count(best) - target):
+            best = candidate
+    return best, count(best), len(seen)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Règle une scène pour qu'elle joue tout son morceau.")
+    parser.add_argument("scene", help="script de la scène")
+    parser.add_argument("--music", help="fichier MIDI (par défaut, celui du script)")
+    parser.add_argument("--seconds", type=float, help="durée du clip (par défaut GAME_DURATION, ou 30 s)")
+    parser.add_argument("--tolerance", type=int, default=0,
+                        help="écart accepté entre rebonds et accords (0 par défaut : il faut tomber juste)")
+    parser.add_argument("--seed", type=int, action="append",
+                        help="graine du clip à rendre (répétable : moyenne des parties ; par défaut BOUNCY_SEED)")
+    parser.add_argument("--write", action="store_true", help="réécrit les constantes trouvées dans le script")
+    args = parser.parse_args()
+
+    name = os.path.basename(args.scene)
+    if name not in MODELS:
+        parser.error(f"scène sans modèle de réglage : {name} (connues : {', '.join(MODELS)})")
+    scene_cls = scene.load(args.scene)
+    env_seed = os.environ.get("BOUNCY_SEED")
+    seeds = args.seed or [int(env_seed) if env_seed is not None else SEED]
+    model = MODELS[name](scene_cls, seeds)
+    music = args.music or scene.asset(scene_cls.song)
+    target = len(timeline.load(music))
+    seconds = args.seconds or model.default_seconds()
+    steps = int(round(seconds * scene_cls.fps))
+
+    t0 = time.perf_counter()
+    values, bounces, runs = fit(model, target, steps)
+    elapsed = time.perf_counter() - t0
+    if isinstance(model, RaceModel):
+        values["GAME_DURATION"] = seconds if seconds != int(seconds) else int(seconds)
+
+    print(f"{os.path.basename(music)} : {target} accords, clip de {seconds:g} s ({steps} pas)")
+    print(f"{bounces} rebonds, écart {bounces - target:+d} ({runs} simulations en {elapsed:.2f} s)")
+    if len(seeds) > 1:
+        counts = model.counts(values, steps, 2 * target + 10)
+        print("par graine : " + ", ".join(f"{seed} : {n - target:+d}" for seed, n in zip(seeds, counts)))
+    for key, value in values.items():
+        print(f"{key} = {value!r}")
+    if abs(bounces - target) > args.tolerance:
+        # meilleur réglage trouvé, mais hors d'atteinte de l'objectif : rien n'est écrit
+        print(f"objectif manqué : {bounces} rebonds pour {target} accords "
+              f"(tolérance {args.tolerance}) ; constantes non écrites", file=sys.stderr)
+        sys.exit(1)
+    if args.write:
+        write_constants(args.scene, values)
+        print(f"constantes écrites dans {args.scene}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Fichiers MIDI tronqués : smf.read lève ValueError quelle que soit la coupure,
+et l'index les marque en erreur sans interrompre l'analyse des autres fichiers.
+Les octets de bourrage après la dernière piste sont ignorés.
+
+Depuis la racine du projet :
+    python -m unittest tests.test_library
+"""
+import os
+import shutil
+import tempfile
+import unittest
+
+from engine import library, smf
+
+SOURCE = os.path.join(library.MUSIC_FOLDER, "Tetris1.mid")
+
+
+class TruncatedMidiTest(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.folder)
+        with open(SOURCE, "rb") as f:
+            self.data = f.read()
+
+    def write(self, name, data):
+        path = os.path.join(self.folder, name)
+        with open(path, "wb") as f:
+            f.write(data)
+        return path
+
+    def test_read_raises_value_error(self):
+        # toutes les coupures : en-tête, tempo, et en particulier celles qui tombent
+        # entre deux événements d'une piste
+        for size in range(len(self.data)):
+            path = self.write("cut.mid", self.data[:size])
+            with self.subTest(size=size):
+                with self.assertRaises(ValueError):
+                    smf.read(path)
+
+    def test_read_ignores_padding(self):
+        # octets de bourrage après la dernière piste annoncée : ignorés, comme par mido
+        notes = [inst.notes for inst in smf.read(SOURCE)]
+        for padding in (b"\x00", b"\x00" * 3, b"\x00" * 4, b"\x00" * 16, b"MTrk"):
+            path = self.write("padded.mid", self.data + padding)
+            with self.subTest(padding=padding):
+                self.assertEqual([inst.notes for inst in smf.read(path)], notes)
+
+    def test_short_header(self):
+        path = self.write("header.mid", b"MThd\x00\x00\x00\x06\x00\x01")
+        with self.assertRaises(ValueError):
+            smf.read(path)
+
+    def test_build_marks_error(self):
+        shutil.copy(SOURCE, self.folder)
+        self.write("header.mid", b"MThd\x00\x00\x00\x06\x00\x01")
+        self.write("track.mid", self.data[:len(self.data) // 2])
+        files = library.build(self.folder, workers=2)
+        self.assertIn("chords", files["Tetris1.mid"])
+        self.assertIn("error", files["header.mid"])
+        self.assertIn("error", files["track.mid"])
+
+
+if __name__ == "__main__":
+    unittest.main()
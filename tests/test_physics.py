@@ -0,0 +1,69 @@
+"""
+Balle poussée au-delà du bord d'un anneau (choc entre balles) alors qu'elle
+revient vers le centre : Ring.sweep, Swarm.contain et les balles des courses
+la recalent sur le bord, hors de l'ouverture seulement.
+
+Depuis la racine du projet :
+    python -m unittest tests.test_physics
+"""
+import math
+import unittest
+
+from engine import race, swarm
+from engine.arcs import ArcIndex
+from engine.physics import Body, Ring
+
+RADIUS = 500
+BALL = 18
+REACH = RADIUS - BALL
+
+
+class PushedOutsideTest(unittest.TestCase):
+    def ring(self):
+        # ouverture en haut de l'écran (angle π/2) ; la balle est poussée à droite
+        return Ring(0.0, 0.0, RADIUS, 6, math.pi / 2, math.pi / 4)
+
+    def test_sweep_clamps_inward_ball(self):
+        ring = self.ring()
+        ball = Body(543.0, 0.0, BALL, vx=-5.0)
+        x0, y0 = ball.x, ball.y
+        ball.integrate(0.0)
+        hits, exit_time = ring.sweep(ball, x0, y0)
+        self.assertEqual(hits, [])
+        self.assertIsNone(exit_time)
+        self.assertAlmostEqual(ball.x, REACH - 5.0)
+        self.assertAlmostEqual(ball.y, 0.0)
+
+    def test_sweep_leaves_ball_in_gap(self):
+        ring = self.ring()
+        ball = Body(0.0, -543.0, BALL, vy=5.0)
+        x0, y0 = ball.x, ball.y
+        ball.integrate(0.0)
+        ring.sweep(ball, x0, y0)
+        self.assertAlmostEqual(ball.y, -538.0)
+
+    def test_contain_clamps_inward_balls(self):
+        ring = self.ring()
+        balls = swarm.Swarm()
+        balls.add(2, [543.0, 0.0], [0.0, -543.0], [-5.0, 0.0], [0.0, 5.0], BALL, 1.0)
+        balls.integrate(0.0)
+        exits, hits = balls.contain(ring)
+        d = balls.data
+        self.assertEqual(len(exits), 0)
+        self.assertEqual(len(hits[0]), 0)
+        self.assertAlmostEqual(d[0, swarm.X], REACH - 5.0)
+        self.assertAlmostEqual(d[0, swarm.Y], 0.0)
+        # dans l'ouverture : pas de recalage
+        self.assertAlmostEqual(d[1, swarm.Y], -538.0)
+
+    def test_race_ball_clamps_to_inner_arc(self):
+        # deux anneaux dépassés : la balle revient sur le plus petit
+        arcs = ArcIndex(0.0, 0.0, [race.Arc(0.0, 0.0, r, 9, math.pi / 2, math.pi / 4) for r in (480, RADIUS)])
+        ball = race.Ball(543.0, 0.0, BALL, -5.0, 0.0, 1.0, (255, 255, 255), "", None)
+        self.assertEqual(ball.update(arcs, 0.0, math.inf), 0)
+        self.assertAlmostEqual(ball.x, 480 - BALL - 5.0)
+        self.assertAlmostEqual(ball.y, 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()